@@ -1,6 +1,7 @@
 from reddit_scraper import fetch_posts
 from text_cleaner import clean_text
-import json
+import raw_store
+from keyword_matcher import KeywordMatcher
 import csv
 
 # Enhanced list of problem signal keywords/phrases
@@ -18,16 +19,30 @@ problem_keywords = [
     "environment issue", "version conflict", "ci error", "deployment error",
     "cors issue", "ssl error", "authorization denied", "index out of range"
 ]
+problem_matcher = KeywordMatcher(problem_keywords)
 
 def is_problem_post(text):
     text = text.lower()
-    signals_found = [kw for kw in problem_keywords if kw in text]
+    signals_found = problem_matcher.find_all(text)
     return len(signals_found) >= 2, signals_found
 
 def compute_problem_score(post, signals):
     score = (post['score'] * 0.5) + (len(post['comments']) * 1) + (len(signals) * 2)
     return score
 
+def store_record(post):
+    """The post in the raw store's schema (title/text rather than selftext/comments)."""
+    return {
+        "id": raw_store.post_id(post),
+        "subreddit": post.get("subreddit", "learnprogramming"),
+        "title": post["title"],
+        "text": post.get("selftext", ""),
+        "created_utc": post.get("created_utc"),
+        "url": post.get("url"),
+        "score": post["score"],
+        "num_comments": post.get("num_comments", len(post["comments"])),
+    }
+
 def main():
     print("Fetching Reddit posts...\n")
     posts = fetch_posts(subreddit_name="learnprogramming", limit=30)
@@ -49,9 +64,8 @@ def main():
     # Sort by computed score descending
     filtered_posts.sort(key=lambda x: x['score_rank'], reverse=True)
 
-    # Save filtered posts
-    with open("data/raw_data.json", "w") as f:
-        json.dump(filtered_posts, f, indent=2)
+    # Append filtered posts to the raw store
+    written = raw_store.append_posts([store_record(post) for post in filtered_posts])
 
     # Save summary to CSV
     with open("output/ranked_problems.csv", "w", newline="") as csvfile:
@@ -69,7 +83,7 @@ def main():
                 post['url']
             ])
 
-    print(f"\n{len(filtered_posts)} problem-heavy posts saved to data/raw_data.json")
+    print(f"\n{len(filtered_posts)} problem-heavy posts found, {written} new appended to {raw_store.RAW_STORE_PATH}")
     print("Top 15 ranked problems saved to output/ranked_problems.csv")
 
 if __name__ == "__main__":
@@ -0,0 +1,59 @@
+# benchmarks/bench_artifacts.py
+# Run from the project root: python -m benchmarks.bench_artifacts
+# Compares cold-load time and resident memory of the joblib pickles with the lean artifacts.
+
+import json
+import subprocess
+import sys
+
+PICKLES = {
+    "logistic_regression": ("ml_models/problem_classifier.pkl", "ml_models/tfidf_vectorizer.pkl"),
+    "random_forest": ("ml_models/random_forest_classifier.pkl", "ml_models/rf_tfidf_vectorizer.pkl"),
+}
+
+# Runs in a fresh interpreter; heavy imports happen before the clock starts
+PROBE = """
+import json, sys, time
+import joblib, numpy, sklearn.ensemble, sklearn.linear_model, sklearn.feature_extraction.text
+from ml_models.artifacts import load_artifact
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+mode, name, model_path, vectorizer_path = sys.argv[1:]
+before = rss_mb()
+start = time.perf_counter()
+if mode == "pickle":
+    model, vectorizer = joblib.load(model_path), joblib.load(vectorizer_path)
+else:
+    model, vectorizer, _ = load_artifact(name)
+elapsed = time.perf_counter() - start
+print(json.dumps({"load_ms": elapsed * 1000, "rss_mb": rss_mb() - before}))
+"""
+
+
+def probe(mode, name, paths, runs):
+    results = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", PROBE, mode, name, *paths],
+                             check=True, capture_output=True, text=True).stdout
+        results.append(json.loads(out.strip().splitlines()[-1]))
+    best = min(results, key=lambda r: r["load_ms"])
+    return best["load_ms"], best["rss_mb"]
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    print(f"{'model':<22}{'format':<8}{'cold load':>12}{'resident':>12}")
+    for name, paths in PICKLES.items():
+        for mode in ("pickle", "lean"):
+            load_ms, rss = probe(mode, name, paths, runs)
+            print(f"{name:<22}{mode:<8}{load_ms:>9.1f} ms{rss:>9.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
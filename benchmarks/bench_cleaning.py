@@ -0,0 +1,48 @@
+# benchmarks/bench_cleaning.py
+# Run from the project root: python -m benchmarks.bench_cleaning --rows 100000
+
+import argparse
+import time
+
+import pandas as pd
+
+import raw_store
+from text_cleaner import clean_text, clean_texts
+
+
+def load_corpus(rows):
+    """Repeat the stored posts until the corpus has `rows` combined texts."""
+    posts = list(raw_store.iter_posts())
+    texts = [f"{post.get('title') or ''} {post.get('text') or ''}" for post in posts]
+    if not texts:
+        raise SystemExit("raw store is empty. Please scrape posts first.")
+    repeats = rows // len(texts) + 1
+    return pd.Series((texts * repeats)[:rows])
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-row vs batch text cleaning.")
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    texts = load_corpus(args.rows)
+    print(f"Cleaning {len(texts)} posts")
+
+    baseline, t_apply = timed(texts.apply, clean_text)
+    print(f"apply(clean_text)              {t_apply:7.2f}s")
+
+    for tokenize in ("treebank", "fast"):
+        result, elapsed = timed(clean_texts, texts, tokenize=tokenize)
+        identical = result.equals(baseline)
+        print(f"clean_texts(tokenize={tokenize!r:<10}) {elapsed:7.2f}s  "
+              f"x{t_apply / elapsed:.1f}  identical={identical}")
+
+
+if __name__ == "__main__":
+    main()
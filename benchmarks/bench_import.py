@@ -0,0 +1,37 @@
+# benchmarks/bench_import.py
+# Run from the project root: python -m benchmarks.bench_import
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+MODULES = ["text_cleaner", "raw_store", "keyword_matcher", "reddit_scraper"]
+
+
+def import_time(statement, runs):
+    """Median wall time of a fresh interpreter running `statement`, in milliseconds."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold import time of pipeline modules.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    args = parser.parse_args()
+
+    baseline = import_time("pass", args.runs)
+    print(f"{'interpreter startup':<24} {baseline:8.1f} ms")
+    for module in args.modules:
+        elapsed = import_time(f"import {module}", args.runs)
+        print(f"{'import ' + module:<24} {elapsed:8.1f} ms  (+{elapsed - baseline:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
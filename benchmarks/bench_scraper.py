@@ -0,0 +1,35 @@
+# benchmarks/bench_scraper.py
+# Run from the project root: python -m benchmarks.bench_scraper
+
+import argparse
+import time
+
+from benchmarks.fake_reddit import FakeReddit
+from reddit_scraper import SUBREDDITS, RateLimiter, fetch_all_subreddits
+
+
+def run(workers, latency, posts_per_sub, rpm):
+    reddit = FakeReddit(posts_per_sub=posts_per_sub, latency=latency)
+    limiter = RateLimiter(rate=rpm)
+    start = time.perf_counter()
+    posts, _ = fetch_all_subreddits(reddit, workers=workers, limiter=limiter)
+    elapsed = time.perf_counter() - start
+    return elapsed, len(posts), limiter.calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sequential vs concurrent scraping offline.")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per fake API request")
+    parser.add_argument("--posts-per-sub", type=int, default=100)
+    parser.add_argument("--rpm", type=int, default=600)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    print(f"{len(SUBREDDITS)} subreddits, {args.latency}s per request, {args.rpm} requests/min")
+    for workers in args.workers:
+        elapsed, n_posts, calls = run(workers, args.latency, args.posts_per_sub, args.rpm)
+        print(f"workers={workers:<3} {elapsed:6.2f}s  posts={n_posts}  requests={calls}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# benchmarks/fake_reddit.py
+
+import random
+import time
+
+# Words used to build fake titles/bodies; some overlap reddit_scraper.KEYWORDS
+WORDS = [
+    "python", "react", "docker", "error", "issue", "bug", "help", "stuck",
+    "compile", "deploy", "api", "database", "loop", "function", "class",
+    "server", "frontend", "backend", "test", "build", "install", "version"
+]
+
+
+class FakeSubmission:
+    """Just the attributes of a praw Submission that the scraper reads."""
+
+    def __init__(self, subreddit, post_id, title, selftext, created_utc, score, num_comments):
+        self.id = post_id
+        self.title = title
+        self.selftext = selftext
+        self.created_utc = created_utc
+        self.url = f"https://www.reddit.com/r/{subreddit}/comments/{post_id}/"
+        self.score = score
+        self.num_comments = num_comments
+
+
+class FakeSubreddit:
+    def __init__(self, reddit, name):
+        self.reddit = reddit
+        self.display_name = name
+
+    def new(self, limit=100, params=None):
+        """Yield posts newest first, sleeping `latency` once per page like a real listing request."""
+        posts = self.reddit.posts_for(self.display_name)
+        if limit is not None:
+            posts = posts[:limit]
+        for i, post in enumerate(posts):
+            if i % self.reddit.page_size == 0:
+                self.reddit.requests += 1
+                time.sleep(self.reddit.latency)
+            yield post
+
+
+class FakeReddit:
+    """
+    Offline stand-in for praw.Reddit: deterministic posts per subreddit and a
+    fixed per-request latency, so scraper runs can be benchmarked without the API.
+    """
+
+    def __init__(self, posts_per_sub=100, latency=0.2, page_size=100, seed=42, now=None):
+        self.posts_per_sub = posts_per_sub
+        self.latency = latency
+        self.page_size = page_size
+        self.seed = seed
+        self.now = now if now is not None else time.time()
+        self.requests = 0
+        self._posts = {}
+
+    def subreddit(self, name):
+        return FakeSubreddit(self, name)
+
+    def posts_for(self, name):
+        if name not in self._posts:
+            rng = random.Random(f"{self.seed}-{name}")
+            created = self.now
+            posts = []
+            for i in range(self.posts_per_sub):
+                created -= rng.randint(60, 3600)
+                posts.append(FakeSubmission(
+                    subreddit=name,
+                    post_id=f"{name.lower()[:3]}{i:06d}",
+                    title=" ".join(rng.choices(WORDS, k=6)),
+                    selftext=" ".join(rng.choices(WORDS, k=40)),
+                    created_utc=float(int(created)),
+                    score=rng.randint(0, 500),
+                    num_comments=rng.randint(0, 80)
+                ))
+            self._posts[name] = posts
+        return self._posts[name]
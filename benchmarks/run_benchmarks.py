@@ -0,0 +1,295 @@
+# benchmarks/run_benchmarks.py
+# Run from the project root:
+#   python -m benchmarks.run_benchmarks run --size 100k
+#   python -m benchmarks.run_benchmarks run --size 10k cleaning tfidf --repeat 3
+#   python -m benchmarks.run_benchmarks compare data/benchmarks/results/<old>.json data/benchmarks/results/<new>.json
+#
+# Runs the pipeline's hot paths on a synthetic corpus (benchmarks/synthetic_corpus.py)
+# and writes one JSON file per run, named after the commit and corpus size, so runs
+# from different commits can be compared:
+#
+#   data/benchmarks/results/<commit>-<size>.json
+#
+# Inputs a benchmark needs (cleaned text, TF-IDF matrix, labels, a trained model)
+# are built before its timer starts. TextBlob labeling and clustering run on at
+# most SAMPLE_ROWS posts, the same sample at every corpus size.
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+from benchmarks.synthetic_corpus import SEED, load_corpus, parse_size, size_label
+from instrumentation import measure
+
+RESULTS_DIR = "data/benchmarks/results"
+SAMPLE_ROWS = 20_000
+N_TOPICS = 10
+N_CLUSTERS = 5
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Inputs:
+    """Shared benchmark inputs, each built on first use and reused by later benchmarks."""
+
+    def __init__(self, df):
+        self.df = df
+        self._cache = {}
+
+    def _get(self, key, build):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    @property
+    def combined(self):
+        return self._get("combined", lambda: (self.df["title"].fillna("") + " " + self.df["text"].fillna("")).tolist())
+
+    @property
+    def clean(self):
+        from text_cleaner import clean_texts
+        return self._get("clean", lambda: clean_texts(self.combined))
+
+    @property
+    def sample(self):
+        return self.combined[:SAMPLE_ROWS]
+
+    def tfidf(self, name):
+        from feature_store import VECTORIZER_CONFIGS
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        def build():
+            vectorizer = TfidfVectorizer(**VECTORIZER_CONFIGS[name])
+            return vectorizer.fit_transform(self.clean), vectorizer
+        return self._get(f"tfidf-{name}", build)
+
+    @property
+    def labels(self):
+        # keyword matches stand in for the full labels: TextBlob over 1M posts would dominate the setup
+        from text_cleaner import has_problem_keyword
+        return self._get("labels", lambda: np.array([has_problem_keyword(text) for text in self.combined]))
+
+    @property
+    def classifier(self):
+        from sklearn.linear_model import LogisticRegression
+
+        def build():
+            X, _ = self.tfidf("english")
+            return LogisticRegression(max_iter=1000, class_weight="balanced").fit(X, self.labels)
+        return self._get("classifier", build)
+
+
+# Each benchmark prepares its inputs and returns (rows, the function to time).
+
+def bench_cleaning(inputs):
+    from text_cleaner import clean_texts
+    texts = inputs.combined
+    return len(texts), lambda: clean_texts(texts)
+
+
+def bench_labeling(inputs):
+    from sentiment import get_backend
+    from text_cleaner import label_posts
+    texts = inputs.sample
+    get_backend("textblob").polarity(texts[:1])  # lexicon loading is not part of the timing
+    return len(texts), lambda: label_posts(texts, "textblob")
+
+
+def bench_labeling_lexicon(inputs):
+    from sentiment import get_backend
+    from text_cleaner import label_posts
+    texts = inputs.combined
+    get_backend("lexicon")
+    return len(texts), lambda: label_posts(texts, "lexicon")
+
+
+def bench_keyword_matching(inputs):
+    from text_cleaner import has_problem_keyword
+    texts = inputs.combined
+    return len(texts), lambda: [has_problem_keyword(text) for text in texts]
+
+
+def bench_dedup(inputs):
+    from dedup import MinHashIndex
+    docs, ids = inputs.clean, inputs.df["id"].tolist()
+    return len(docs), lambda: MinHashIndex().update(ids, docs)
+
+
+def bench_tfidf(inputs):
+    from feature_store import VECTORIZER_CONFIGS
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    docs = inputs.clean
+    return len(docs), lambda: TfidfVectorizer(**VECTORIZER_CONFIGS["english"]).fit_transform(docs)
+
+
+def bench_nmf(inputs):
+    from topic_modeling import fit_topic_model
+    features = inputs.tfidf("english")
+    return features[0].shape[0], lambda: fit_topic_model(None, N_TOPICS, features=features)
+
+
+def bench_classifier_train(inputs):
+    from sklearn.linear_model import LogisticRegression
+    X, _ = inputs.tfidf("english")
+    y = inputs.labels
+    return X.shape[0], lambda: LogisticRegression(max_iter=1000, class_weight="balanced").fit(X, y)
+
+
+def bench_classifier_score(inputs):
+    from scoring_service import ProblemScorer
+
+    # the scoring service end to end (clean -> TF-IDF -> predict_proba in micro-batches),
+    # loading the freshly trained model from pickles instead of the project's artifact
+    directory = tempfile.mkdtemp(prefix="innomine-bench-")
+    model_path, vectorizer_path = os.path.join(directory, "model.pkl"), os.path.join(directory, "vectorizer.pkl")
+    joblib.dump(inputs.classifier, model_path)
+    joblib.dump(inputs.tfidf("english")[1], vectorizer_path)
+    scorer = ProblemScorer(model_path, vectorizer_path, artifact=os.path.join(directory, "no-artifact"))
+    texts = inputs.combined
+    return len(texts), lambda: scorer.score(texts)
+
+
+def bench_clustering(inputs):
+    from visualizations.problem_clustering import fit_production
+    X, _ = inputs.tfidf("top500")
+    X = X[:SAMPLE_ROWS]
+    return X.shape[0], lambda: fit_production(X, N_CLUSTERS)
+
+
+def bench_cooccurrence(inputs):
+    from visualizations.cooccurrence import CooccurrenceIndex
+    docs, ids = inputs.clean, inputs.df["id"].tolist()
+    return len(docs), lambda: CooccurrenceIndex().build(docs, ids)
+
+
+BENCHMARKS = {
+    "cleaning": bench_cleaning,
+    "labeling": bench_labeling,
+    "labeling_lexicon": bench_labeling_lexicon,
+    "keyword_matching": bench_keyword_matching,
+    "dedup": bench_dedup,
+    "tfidf": bench_tfidf,
+    "nmf": bench_nmf,
+    "classifier_train": bench_classifier_train,
+    "classifier_score": bench_classifier_score,
+    "clustering": bench_clustering,
+    "cooccurrence": bench_cooccurrence,
+}
+
+
+def git_commit():
+    """Short hash of HEAD, with '-dirty' if the tree has uncommitted changes; 'unknown' outside git."""
+    try:
+        commit = subprocess.run(["git", "-C", PROJECT_ROOT, "rev-parse", "--short", "HEAD"],
+                                capture_output=True, text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "-C", PROJECT_ROOT, "status", "--porcelain", "--untracked-files=no"],
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if status else commit
+
+
+def run_benchmark(name, inputs, repeat=1):
+    """Median wall/CPU time over `repeat` runs, throughput at the median and the highest peak RSS."""
+    rows, fn = BENCHMARKS[name](inputs)
+    records = []
+    for _ in range(repeat):
+        with measure(f"bench.{name}", rows=rows) as record:
+            fn()
+        records.append(record)
+    wall = float(np.median([r["wall_s"] for r in records]))
+    return {
+        "name": name,
+        "rows": rows,
+        "runs": repeat,
+        "wall_s": round(wall, 4),
+        "cpu_s": round(float(np.median([r["cpu_s"] for r in records])), 4),
+        "rows_per_s": round(rows / wall, 1) if wall > 0 else None,
+        "peak_rss_mb": max(r["peak_rss_mb"] for r in records),
+    }
+
+
+def run(rows, names=None, repeat=1, seed=SEED, output=None):
+    names = names or list(BENCHMARKS)
+    df = load_corpus(rows, seed)
+    inputs = Inputs(df)
+    report = {
+        "commit": git_commit(),
+        "size": size_label(rows),
+        "rows": len(df),
+        "seed": seed,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": [],
+    }
+    # only the benchmark records are wanted here, not the instrumented pipeline blocks they call
+    os.environ.setdefault("INNOMINE_METRICS", "off")
+    for name in names:
+        result = run_benchmark(name, inputs, repeat)
+        report["results"].append(result)
+        print(f"{name:<18} {result['wall_s']:9.3f}s  {result['rows_per_s'] or 0:12.1f} rows/s  "
+              f"{result['peak_rss_mb']:8.1f} MB")
+
+    output = output or os.path.join(RESULTS_DIR, f"{report['commit']}-{report['size']}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results written to {output}")
+    return report
+
+
+def compare(baseline_path, current_path):
+    """Per-benchmark wall time of two result files; speedup > 1 means the current run is faster."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    with open(current_path) as f:
+        current = json.load(f)
+    if baseline["rows"] != current["rows"]:
+        print(f"⚠️ Different corpus sizes: {baseline['rows']} vs {current['rows']} posts")
+
+    print(f"{'benchmark':<18} {baseline['commit']:>14} {current['commit']:>14}  speedup  peak MB")
+    before = {result["name"]: result for result in baseline["results"]}
+    for result in current["results"]:
+        old = before.get(result["name"])
+        if old is None:
+            print(f"{result['name']:<18} {'-':>14} {result['wall_s']:13.3f}s")
+            continue
+        speedup = old["wall_s"] / result["wall_s"] if result["wall_s"] else float("inf")
+        print(f"{result['name']:<18} {old['wall_s']:13.3f}s {result['wall_s']:13.3f}s  x{speedup:6.2f}  "
+              f"{old['peak_rss_mb']:.0f} -> {result['peak_rss_mb']:.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline on a synthetic Reddit corpus.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run benchmarks and write a result file")
+    run_parser.add_argument("names", nargs="*", help=f"only these benchmarks ({', '.join(BENCHMARKS)})")
+    run_parser.add_argument("--size", default="100k", help="10k, 100k, 1m or a number of posts")
+    run_parser.add_argument("--repeat", type=int, default=1, help="runs per benchmark; the median is reported")
+    run_parser.add_argument("--seed", type=int, default=SEED)
+    run_parser.add_argument("--output", default=None, help="result file (default: data/benchmarks/results/<commit>-<size>.json)")
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        compare(args.baseline, args.current)
+        return
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        sys.exit(f"Unknown benchmarks: {', '.join(unknown)}")
+    run(parse_size(args.size), args.names, args.repeat, args.seed, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+# benchmarks/synthetic_corpus.py
+# Run from the project root: python -m benchmarks.synthetic_corpus --size 100k
+#
+# Deterministic synthetic Reddit posts in the raw store's schema, so the
+# pipeline can be benchmarked offline at sizes the real scrape never reaches.
+# The same size and seed always give the same file:
+#
+#   data/benchmarks/corpus-10k.jsonl, corpus-100k.jsonl, corpus-1m.jsonl
+#
+# Posts mix filler words, per-subreddit topic vocabularies, problem phrases,
+# sentiment words, URLs and code fragments, and a few are cross-posted
+# (copied, lightly edited) to a second subreddit.
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import raw_store
+from reddit_scraper import SUBREDDITS
+
+CORPUS_DIR = "data/benchmarks"
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+SEED = 42
+CHUNK_SIZE = 10_000
+# posts end here and go back PERIOD_DAYS, so the corpus doesn't depend on today's date
+END_UTC = 1735689600  # 2025-01-01
+PERIOD_DAYS = 90
+
+PROBLEM_RATE = 0.45
+CROSSPOST_RATE = 0.03
+LINK_RATE = 0.1
+CODE_RATE = 0.1
+
+FILLER = (
+    "the a an and or but so to of in on for with at by from is are was were be been have has had "
+    "it this that these those my your our their i you we they me just really also very some any "
+    "when then than there here what which who how all more most other only about into over after "
+    "before again still already even now today yesterday week project code thing way time trying"
+).split()
+
+GENERIC = (
+    "function variable class method object array string list dict loop file folder path config "
+    "install package library module import version update build compile run test debug deploy "
+    "server client request response api endpoint database query table schema cache memory thread "
+    "process log output input script terminal command editor ide git branch commit merge repo"
+).split()
+
+# one vocabulary per theme; every subreddit draws most topic words from its theme
+THEMES = {
+    "web": "html css javascript dom browser layout flexbox grid responsive form button page route "
+           "fetch cors cookie session webpack vite bundle npm node express",
+    "react": "react component props state hook useeffect usestate render jsx redux context router "
+             "nextjs typescript rerender virtual prop child parent",
+    "python": "python pip venv conda pandas numpy django flask decorator generator list comprehension "
+              "indentation traceback interpreter pytest jupyter notebook asyncio",
+    "data": "dataset dataframe model training accuracy feature regression classification pipeline "
+            "sklearn tensorflow pytorch gradient epoch overfitting notebook plot csv kaggle",
+    "java": "java jvm spring maven gradle interface inheritance nullpointerexception garbage jar "
+            "hibernate bean annotation generic stream lambda",
+    "cpp": "pointer reference segfault template vector header linker compiler undefined behavior "
+           "malloc destructor constructor stl cmake iterator overload",
+    "devops": "docker kubernetes container image pod cluster nginx ci pipeline terraform aws cloud "
+              "helm yaml ssh linux permission port volume",
+    "career": "career job interview resume junior senior bootcamp degree course learning beginner "
+              "roadmap portfolio internship leetcode algorithm recursion",
+}
+SUBREDDIT_THEMES = {
+    "learnprogramming": "career", "webdev": "web", "reactjs": "react", "datascience": "data",
+    "coding": "career", "Python": "python", "java": "java", "cpp_questions": "cpp",
+    "programming": "career", "AskProgramming": "career", "machinelearning": "data",
+    "computerscience": "career", "devops": "devops", "Frontend": "web", "backend": "devops",
+}
+
+PROBLEM_PHRASES = [
+    "stuck on", "getting an error with", "help with", "how do i fix", "why does my",
+    "can't get", "bug in", "issue with", "not working", "keeps failing", "broken after",
+    "frustrated with", "problem with",
+]
+NEGATIVE = "annoying confusing terrible awful slow weird impossible ugly worst horrible bad wrong".split()
+POSITIVE = "great awesome nice love happy amazing clean easy best helpful cool good".split()
+CODE_FRAGMENTS = [
+    "TypeError: 'NoneType' object is not subscriptable",
+    "Segmentation fault (core dumped)",
+    "Uncaught ReferenceError: x is not defined",
+    "npm ERR! code ERESOLVE",
+    "java.lang.NullPointerException at Main.java:42",
+    "ModuleNotFoundError: No module named 'numpy'",
+    "exit code 137 (OOMKilled)",
+]
+
+# title and body word mix: filler, generic, topic, sentiment
+MIX = np.array([0.45, 0.2, 0.3, 0.05])
+TITLE_MIX = np.array([0.25, 0.3, 0.45, 0.0])
+
+
+def parse_size(size):
+    """'10k', '1m' or a plain number of posts."""
+    size = str(size).lower()
+    if size in SIZES:
+        return SIZES[size]
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(size[-1:], 1)
+    return int(float(size.rstrip("km")) * multiplier)
+
+
+def size_label(rows):
+    for label, n in SIZES.items():
+        if n == rows:
+            return label
+    return str(rows)
+
+
+def corpus_path(rows, seed=SEED):
+    suffix = "" if seed == SEED else f"-s{seed}"
+    return os.path.join(CORPUS_DIR, f"corpus-{size_label(rows)}{suffix}.jsonl")
+
+
+class _Vocabulary:
+    """All word lists in one array, so a whole chunk's words are one fancy-indexing lookup."""
+
+    def __init__(self):
+        themes = sorted(THEMES)
+        self.subreddits = np.array(SUBREDDITS)
+        self.theme_of = np.array([themes.index(SUBREDDIT_THEMES[s]) for s in SUBREDDITS])
+        theme_words = [THEMES[t].split() for t in themes]
+        groups = [FILLER, GENERIC] + theme_words + [NEGATIVE, POSITIVE]
+        self.words = np.array([w for group in groups for w in group], dtype=object)
+        starts = np.cumsum([0] + [len(group) for group in groups])
+        self.start, self.size = starts[:-1], np.diff(starts)
+        self.n_themes = len(themes)
+
+    def sample(self, rng, n_words, topic, problem, mix):
+        """Words for posts with `n_words` words each, topic theme ids and problem flags."""
+        total = int(n_words.sum())
+        post = np.repeat(np.arange(len(n_words)), n_words)
+        kind = rng.choice(len(mix), size=total, p=mix)
+        # group per word: filler 0, generic 1, the post's theme 2.., then negative or positive
+        group = np.where(kind == 2, 2 + topic[post], kind)
+        sentiment = kind == 3
+        negative = rng.random(total) < np.where(problem[post], 0.8, 0.3)
+        group = np.where(sentiment, np.where(negative, 2 + self.n_themes, 3 + self.n_themes), group)
+        # squared uniforms skew towards the start of each list, a rough Zipf shape
+        offset = (rng.random(total) ** 2 * self.size[group]).astype(np.int64)
+        words = self.words[self.start[group] + offset]
+        bounds = np.cumsum(n_words)[:-1]
+        return [" ".join(chunk) for chunk in np.split(words, bounds)]
+
+
+def generate_chunk(rng, vocab, first, n):
+    """`n` posts with sequential ids starting at `first`."""
+    sub = rng.integers(len(SUBREDDITS), size=n)
+    topic = vocab.theme_of[sub]
+    # a sixth of the posts wander off their subreddit's usual theme
+    drift = rng.random(n) < 1 / 6
+    topic = np.where(drift, rng.integers(vocab.n_themes, size=n), topic)
+    problem = rng.random(n) < PROBLEM_RATE
+
+    titles = vocab.sample(rng, rng.integers(4, 13, size=n), topic, problem, TITLE_MIX)
+    body_words = np.clip(rng.lognormal(3.8, 0.8, size=n), 0, 600).astype(np.int64)
+    bodies = vocab.sample(rng, body_words, topic, problem, MIX)
+
+    phrase = rng.integers(len(PROBLEM_PHRASES), size=n)
+    link = rng.random(n) < LINK_RATE
+    code = rng.random(n) < CODE_RATE
+    fragment = rng.integers(len(CODE_FRAGMENTS), size=n)
+    created = END_UTC - rng.integers(PERIOD_DAYS * 86400, size=n)
+    score = np.minimum(rng.zipf(1.8, size=n) - 1, 50_000)
+    comments = rng.poisson(np.sqrt(score) * 2 + 1)
+
+    posts = []
+    for i in range(n):
+        title, text = titles[i].capitalize(), bodies[i]
+        if problem[i]:
+            title = f"{PROBLEM_PHRASES[phrase[i]].capitalize()} {titles[i]}"
+            text = f"{PROBLEM_PHRASES[phrase[i]]} {text}"
+        if code[i]:
+            text = f"{text}\n\n    {CODE_FRAGMENTS[fragment[i]]}"
+        if link[i]:
+            text = f"{text} https://github.com/example/{vocab.words[vocab.start[2 + topic[i]]]}/issues/{i}"
+        posts.append({
+            "id": np.base_repr(first + i, 36).lower(),
+            "subreddit": str(vocab.subreddits[sub[i]]),
+            "title": title,
+            "text": text,
+            "created_utc": float(created[i]),
+            "url": None,
+            "score": int(score[i]),
+            "num_comments": int(comments[i]),
+        })
+
+    # cross-posts: an earlier post of the chunk, re-posted to another subreddit within a day
+    for i in np.flatnonzero(rng.random(n) < CROSSPOST_RATE):
+        source = posts[rng.integers(i + 1)]
+        post = posts[i]
+        post["title"] = source["title"] if rng.random() < 0.5 else f"[x-post] {source['title']}"
+        post["text"] = source["text"] if rng.random() < 0.5 else f"{source['text']} (also asked elsewhere)"
+        post["created_utc"] = source["created_utc"] + float(rng.integers(60, 86400))
+
+    for post in posts:
+        post["url"] = f"https://www.reddit.com/r/{post['subreddit']}/comments/{post['id']}/"
+    return posts
+
+
+def generate_posts(rows, seed=SEED, chunk_size=CHUNK_SIZE):
+    """Yield lists of posts, `chunk_size` at a time; deterministic for a given seed and chunk size."""
+    vocab = _Vocabulary()
+    rng = np.random.default_rng(seed)
+    first = 36 ** 5  # ids look like reddit's six-character base-36 ids
+    for start in range(0, rows, chunk_size):
+        n = min(chunk_size, rows - start)
+        yield generate_chunk(rng, vocab, first + start, n)
+
+
+def write_corpus(rows, seed=SEED, path=None):
+    """Write the corpus as a raw-store JSONL file (replacing any existing one); returns the path."""
+    path = path or corpus_path(rows, seed)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.tmp", "w") as f:
+        for chunk in generate_posts(rows, seed):
+            f.write("".join(json.dumps(post) + "\n" for post in chunk))
+    os.replace(f"{path}.tmp", path)
+    return path
+
+
+def load_corpus(rows, seed=SEED):
+    """The corpus as a raw-store DataFrame; generated on first use."""
+    path = corpus_path(rows, seed)
+    if not os.path.exists(path):
+        print(f"Generating {rows} synthetic posts to {path}")
+        write_corpus(rows, seed, path)
+    return pd.concat(raw_store.iter_chunks(path), ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Reddit corpus for the benchmarks.")
+    parser.add_argument("--size", default="100k", help=f"one of {', '.join(SIZES)} or a number of posts")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--output", default=None, help="JSONL path (default: data/benchmarks/corpus-<size>.jsonl)")
+    args = parser.parse_args()
+
+    rows = parse_size(args.size)
+    start = time.perf_counter()
+    path = write_corpus(rows, args.seed, args.output)
+    print(f"✅ {rows} posts written to {path} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+# dedup.py
+#
+# Collapses near-duplicate posts (the same question cross-posted to several
+# subreddits, or re-posted with small edits) before anything is modeled:
+#
+#   data/cleaned_labeled_posts.csv  ->  data/deduped_posts.csv (+ .parquet)
+#
+# Each post's clean_text is cut into word shingles and summarised by a MinHash
+# signature; signatures are split into bands and only posts that share a band
+# are compared, so finding duplicates stays close to linear in the number of
+# posts. Every group of near-duplicates becomes one canonical post (its
+# earliest) whose score and num_comments are the group's totals and whose
+# `duplicates` column counts the copies folded into it.
+#
+# The signatures and groups are kept in data/dedup/index.pkl, so a run only
+# hashes the posts it hasn't seen and checks them against everything indexed.
+
+import argparse
+import hashlib
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from instrumentation import measure
+from tables import CLEANED_PATH, DEDUPED_PATH, load_table, save_table
+
+DEDUP_DIR = "data/dedup"
+INDEX_PATH = os.path.join(DEDUP_DIR, "index.pkl")
+DUPLICATES_PATH = os.path.join(DEDUP_DIR, "duplicates.csv")
+
+DEDUP_VERSION = 1
+SHINGLE_SIZE = 3  # words per shingle; shorter posts are shingled word by word
+NUM_PERM = 64
+BANDS = 16  # 4 rows per band: pairs above ~0.5 Jaccard similarity usually share a band
+THRESHOLD = 0.7  # estimated Jaccard similarity for two posts to count as duplicates
+BATCH_SIZE = 2000  # posts hashed at once; bounds the (permutations x shingles) work array
+
+MERSENNE = (1 << 31) - 1
+EMPTY = np.iinfo(np.uint32).max
+
+def index_version():
+    """Fingerprint of the settings and of clean_text; an index built under another one is rebuilt."""
+    from text_cleaner import CLEANER_VERSION, get_stop_words
+    payload = json.dumps([DEDUP_VERSION, SHINGLE_SIZE, NUM_PERM, BANDS, THRESHOLD,
+                          CLEANER_VERSION, sorted(get_stop_words())])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+def _shingler(n):
+    # clean_text is already lowercased and tokenized; hashed shingle ids stay below MERSENNE
+    return HashingVectorizer(analyzer="word", ngram_range=(n, n), token_pattern=r"\S+", lowercase=False,
+                             n_features=MERSENNE, binary=True, norm=None, alternate_sign=False)
+
+class MinHashIndex:
+    """
+    MinHash signatures of every indexed post, plus a union-find forest over
+    post positions in which each tree is one group of near-duplicates.
+    """
+
+    def __init__(self, seed=42):
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, MERSENNE, size=NUM_PERM).astype(np.int64)
+        self.b = rng.randint(0, MERSENNE, size=NUM_PERM).astype(np.int64)
+        self.version = index_version()
+        self.ids = []
+        self.signatures = np.empty((0, NUM_PERM), dtype=np.uint32)
+        self.parent = np.empty(0, dtype=np.int64)
+        self.position = {}
+
+    def _minhash(self, X):
+        """Per-row minimum of every hash permutation over the row's shingle ids; EMPTY for rows without shingles."""
+        signatures = np.full((X.shape[0], NUM_PERM), EMPTY, dtype=np.uint32)
+        for start in range(0, X.shape[0], BATCH_SIZE):
+            block = X[start:start + BATCH_SIZE]
+            rows = np.flatnonzero(np.diff(block.indptr))
+            if not len(rows):
+                continue
+            hashes = (self.a[:, None] * block.indices.astype(np.int64) + self.b[:, None]) % MERSENNE
+            signatures[start + rows] = np.minimum.reduceat(hashes, block.indptr[rows], axis=1).T
+        return signatures
+
+    def signatures_of(self, texts):
+        texts = [text if isinstance(text, str) else "" for text in texts]
+        signatures = self._minhash(_shingler(SHINGLE_SIZE).transform(texts))
+        short = [i for i, text in enumerate(texts) if 0 < len(text.split()) < SHINGLE_SIZE]
+        if short:
+            signatures[short] = self._minhash(_shingler(1).transform([texts[i] for i in short]))
+        return signatures
+
+    @staticmethod
+    def _band_keys(signatures):
+        """One 64-bit key per band and post; posts sharing a key are duplicate candidates."""
+        bands = signatures.reshape(len(signatures), BANDS, -1).astype(np.uint64)
+        keys = np.zeros(bands.shape[:2], dtype=np.uint64)
+        for column in range(bands.shape[2]):
+            keys = keys * np.uint64(0x100000001B3) ^ bands[:, :, column]
+        return keys
+
+    def _candidates(self, n_old):
+        """
+        (earlier, new) position pairs that share a band, new = positions >= n_old.
+        A new post is paired with every earlier post in each band bucket it
+        falls into. Posts with identical signatures are interchangeable in the
+        similarity check, so only the first of them takes part in the buckets
+        and the others are paired with it directly; exact cross-posts thus
+        don't make the buckets quadratic.
+        """
+        signatures = np.ascontiguousarray(self.signatures)
+        rows = signatures.view(np.dtype((np.void, signatures.dtype.itemsize * NUM_PERM))).ravel()
+        _, first_index, inverse = np.unique(rows, return_index=True, return_inverse=True)
+        first = first_index[inverse.ravel()]
+        copies = np.flatnonzero((first != np.arange(len(first))) & (np.arange(len(first)) >= n_old))
+        pairs = [np.column_stack([first[copies], copies])]
+
+        distinct = np.flatnonzero(first == np.arange(len(first)))
+        keys = self._band_keys(self.signatures[distinct])
+        for band in range(BANDS):
+            order = np.argsort(keys[:, band], kind="stable")  # positions ascend within a bucket
+            sorted_keys = keys[order, band]
+            run_start = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+            start = np.maximum.accumulate(np.where(run_start, np.arange(len(order)), 0))
+            # each new post against every post before it in its bucket
+            counts = np.where(distinct[order] >= n_old, np.arange(len(order)) - start, 0)
+            right = np.repeat(np.arange(len(order)), counts)
+            left = start[right] + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            pairs.append(np.column_stack([distinct[order[left]], distinct[order[right]]]))
+        pairs = np.unique(np.concatenate(pairs), axis=0)
+        # posts without any text have the EMPTY signature and match each other trivially
+        empty = (self.signatures == EMPTY).all(axis=1)
+        return pairs[~empty[pairs[:, 0]] & ~empty[pairs[:, 1]]]
+
+    def find(self, i):
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def roots(self):
+        """Group root of every indexed position."""
+        parent = self.parent.copy()
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                return parent
+            parent = grand
+
+    def update(self, ids, texts):
+        """
+        Hash the posts whose id isn't indexed yet and merge each into the group
+        of any earlier post it nearly duplicates. Returns the number of new posts.
+        """
+        fresh = {}
+        for post_id, text in zip(ids, texts):
+            if post_id not in self.position and post_id not in fresh:
+                fresh[post_id] = text
+        if not fresh:
+            return 0
+
+        n_old = len(self.ids)
+        self.signatures = np.vstack([self.signatures, self.signatures_of(list(fresh.values()))])
+        self.parent = np.concatenate([self.parent, np.arange(n_old, n_old + len(fresh))])
+        for i, post_id in enumerate(fresh, n_old):
+            self.ids.append(post_id)
+            self.position[post_id] = i
+
+        pairs = self._candidates(n_old)
+        similarity = (self.signatures[pairs[:, 0]] == self.signatures[pairs[:, 1]]).mean(axis=1)
+        for i, j in pairs[similarity >= THRESHOLD]:
+            root_i, root_j = self.find(i), self.find(j)
+            if root_i != root_j:
+                self.parent[max(root_i, root_j)] = min(root_i, root_j)
+        return len(fresh)
+
+def load_index(path=INDEX_PATH):
+    """The saved index, or None if there is none or it was built with other settings."""
+    if not os.path.exists(path):
+        return None
+    # stored as a plain dict so the pickle does not depend on how this module was run
+    index = MinHashIndex()
+    state = joblib.load(path)
+    if state.get("version") != index.version:
+        return None
+    index.__dict__.update(state)
+    index.position = {post_id: i for i, post_id in enumerate(index.ids)}
+    return index
+
+def save_index(index, path=INDEX_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    state = {key: value for key, value in index.__dict__.items() if key != "position"}
+    joblib.dump(state, f"{path}.tmp")
+    os.replace(f"{path}.tmp", path)
+
+def collapse(df, index):
+    """
+    One row per group of near-duplicates: the earliest post, with the group's
+    summed score and num_comments and the number of copies in `duplicates`.
+    Also returns the (id, canonical_id) pairs of the posts folded away.
+    """
+    df = df.drop_duplicates("id").reset_index(drop=True)
+    group = index.roots()[[index.position[post_id] for post_id in df["id"]]]
+    order = df.assign(_group=group).sort_values(["_group", "created_utc", "id"], kind="stable")
+    canonical = order.groupby("_group", sort=False).head(1)
+    canonical_of = pd.Series(canonical["id"].to_numpy(), index=canonical["_group"].to_numpy())
+
+    totals = order.groupby("_group").agg(score=("score", "sum"), num_comments=("num_comments", "sum"),
+                                         copies=("id", "size"))
+    deduped = df.loc[np.sort(canonical.index)].copy()
+    deduped_groups = group[deduped.index]
+    deduped["score"] = totals["score"].reindex(deduped_groups).to_numpy()
+    deduped["num_comments"] = totals["num_comments"].reindex(deduped_groups).to_numpy()
+    deduped["duplicates"] = totals["copies"].reindex(deduped_groups).to_numpy() - 1
+
+    folded = ~df["id"].isin(deduped["id"])
+    duplicates = pd.DataFrame({"id": df.loc[folded, "id"],
+                               "canonical_id": canonical_of.reindex(group[folded.to_numpy()]).to_numpy()})
+    return deduped.reset_index(drop=True), duplicates
+
+def main(rebuild=False):
+    if not os.path.exists(CLEANED_PATH):
+        print("cleaned_labeled_posts.csv not found. Please run text_cleaner.py first.")
+        return
+
+    df = load_table(CLEANED_PATH)
+    index = None if rebuild else load_index()
+    if index is None:
+        print("Building the near-duplicate index from scratch")
+        index = MinHashIndex()
+    with measure("dedup.index", rows=None) as record:
+        record["rows"] = index.update(df["id"].tolist(), df["clean_text"])
+    print(f"Indexed {record['rows']} new posts ({len(index.ids)} in total)")
+    save_index(index)
+
+    deduped, duplicates = collapse(df, index)
+    save_table(deduped, DEDUPED_PATH)
+    duplicates.to_csv(DUPLICATES_PATH, index=False)
+    print(f"Collapsed {len(duplicates)} near-duplicates: {len(deduped)} posts saved to {DEDUPED_PATH}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Collapse near-duplicate and cross-posted posts.")
+    parser.add_argument("--rebuild", action="store_true", help="rehash every post instead of only the new ones")
+    args = parser.parse_args()
+    main(rebuild=args.rebuild)
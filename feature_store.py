@@ -0,0 +1,98 @@
+# feature_store.py
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+
+import joblib
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from tables import DEDUPED_PATH, load_table
+
+FEATURE_DIR = "data/features"
+
+# One shared configuration per vectorizer; every job asks for one of these by name
+VECTORIZER_CONFIGS = {
+    # topic modeling and the logistic regression classifier
+    "english": {"max_df": 0.95, "min_df": 2, "stop_words": "english"},
+    # random forest and model comparison
+    "top1000": {"max_features": 1000},
+    # problem clustering
+    "top500": {"max_features": 500},
+}
+
+def data_version(path=DEDUPED_PATH):
+    """Content hash of the deduplicated posts CSV; features are rebuilt whenever it changes."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+def feature_path(name, version):
+    return os.path.join(FEATURE_DIR, name, version)
+
+def save_matrix(X, directory):
+    """Save a CSR matrix as raw .npy arrays so it can be memory-mapped on load."""
+    X = X.tocsr()
+    X.sum_duplicates()  # canonical format, so nothing needs to sort the read-only arrays later
+    np.save(os.path.join(directory, "data.npy"), X.data)
+    np.save(os.path.join(directory, "indices.npy"), X.indices)
+    np.save(os.path.join(directory, "indptr.npy"), X.indptr)
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump({"shape": list(X.shape), "nnz": int(X.nnz)}, f)
+
+def load_matrix(directory, mmap=True):
+    mode = "r" if mmap else None
+    with open(os.path.join(directory, "meta.json")) as f:
+        meta = json.load(f)
+    arrays = [np.load(os.path.join(directory, f"{part}.npy"), mmap_mode=mode) for part in ("data", "indices", "indptr")]
+    X = sp.csr_matrix(tuple(arrays), shape=tuple(meta["shape"]), copy=False)
+    X.has_canonical_format = True
+    return X
+
+def build_features(name, path=DEDUPED_PATH, docs=None):
+    """Fit the named vectorizer on clean_text and persist matrix, vocabulary and vectorizer."""
+    version = data_version(path)
+    if docs is None:
+        docs = load_table(path, ["clean_text"])["clean_text"]
+    vectorizer = TfidfVectorizer(**VECTORIZER_CONFIGS[name])
+    X = vectorizer.fit_transform(docs.fillna(""))
+
+    # Only the current data version is kept
+    shutil.rmtree(os.path.join(FEATURE_DIR, name), ignore_errors=True)
+    directory = feature_path(name, version)
+    os.makedirs(directory)
+    save_matrix(X, directory)
+    with open(os.path.join(directory, "vocabulary.json"), "w") as f:
+        json.dump(vectorizer.get_feature_names_out().tolist(), f)
+    joblib.dump(vectorizer, os.path.join(directory, "vectorizer.pkl"))
+    return X, vectorizer
+
+def load_features(name, path=DEDUPED_PATH, mmap=True):
+    """
+    TF-IDF matrix (rows in CSV order) and fitted vectorizer for the named config.
+    Built on first use for a data version, then loaded from disk.
+    """
+    directory = feature_path(name, data_version(path))
+    if not os.path.exists(os.path.join(directory, "vectorizer.pkl")):
+        print(f"Building '{name}' TF-IDF features")
+        return build_features(name, path)
+    return load_matrix(directory, mmap), joblib.load(os.path.join(directory, "vectorizer.pkl"))
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the shared TF-IDF feature matrices.")
+    parser.add_argument("names", nargs="*", default=list(VECTORIZER_CONFIGS))
+    args = parser.parse_args()
+
+    docs = load_table(DEDUPED_PATH, ["clean_text"])["clean_text"]
+    for name in args.names:
+        X, _ = build_features(name, docs=docs)
+        print(f"'{name}': {X.shape[0]} posts x {X.shape[1]} terms saved to {FEATURE_DIR}/{name}/")
+
+if __name__ == "__main__":
+    main()
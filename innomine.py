@@ -0,0 +1,396 @@
+# innomine.py
+#
+# End-to-end pipeline runner:
+#
+#   python innomine.py run                 # everything that is out of date
+#   python innomine.py run --skip scrape   # refresh from the posts already stored
+#   python innomine.py status              # what a run would do
+#   python innomine.py run --refit         # refit the topic model instead of updating it
+#
+# Each stage is a script with declared input and output files. A stage is
+# skipped when the content hashes of its inputs and its own code match the
+# last successful run and its outputs are untouched, so a refresh only redoes
+# what new data actually changes. Stages whose dependencies are done run in
+# parallel, each in its own process, with its output in data/pipeline/logs/.
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_DIR = "data/pipeline"
+STATE_PATH = os.path.join(PIPELINE_DIR, "state.json")
+LOG_DIR = os.path.join(PIPELINE_DIR, "logs")
+
+CLEANED = ["data/cleaned_labeled_posts.csv", "data/cleaned_labeled_posts.parquet"]
+DEDUPED = ["data/deduped_posts.csv", "data/deduped_posts.parquet"]
+RANKED = ["output/ranked_problems.csv", "output/ranked_problems.parquet"]
+
+# command: script (relative to the project) and arguments, or ["-c", code]
+# inputs/outputs: files or directories in the working directory; outputs are
+#   every file the stage writes, so no two stages write the same file
+#   (its caches and checkpoints too, SQLite's -wal/-shm files included)
+# code: project files whose changes invalidate the stage; the project modules
+#   imported by its Python files are added automatically (see stage_code)
+# env: environment variables that change what the stage produces, with the
+#   value the stage assumes when one is unset
+# refit: arguments that make a stage which updates a saved model fit a new one,
+#   added by `run --refit`
+STAGES = {
+    "scrape": {
+        "command": ["reddit_scraper.py"],
+        "deps": [],
+        "inputs": [],
+        "outputs": ["data/raw_posts.jsonl", "data/raw_posts.jsonl.ids", "data/scrape_checkpoints.json"],
+        "code": ["reddit_scraper.py", "raw_store.py", "keyword_matcher.py"],
+        "always": True,  # new posts can only be found by asking Reddit
+    },
+    "clean": {
+        "command": ["text_cleaner.py"],
+        "deps": ["scrape"],
+        "inputs": ["data/raw_posts.jsonl"],
+        "outputs": CLEANED + ["data/clean_cache.sqlite", "data/clean_cache.sqlite-wal",
+                              "data/clean_cache.sqlite-shm"],
+        "code": ["text_cleaner.py", "raw_store.py", "keyword_matcher.py", "tables.py", "sentiment.py",
+                 "config/stopwords_english.txt", "config/sentiment_lexicon.tsv"],
+        "env": {"INNOMINE_SENTIMENT": "textblob"},  # labels depend on the sentiment backend
+    },
+    "dedup": {
+        "command": ["dedup.py"],
+        "deps": ["clean"],
+        "inputs": CLEANED,
+        "outputs": DEDUPED + ["data/dedup"],
+        "code": ["dedup.py", "config/stopwords_english.txt"],
+    },
+    "features": {
+        "command": ["feature_store.py"],
+        "deps": ["dedup"],
+        "inputs": DEDUPED,
+        "outputs": ["data/features"],
+        "code": ["feature_store.py"],
+    },
+    "topics": {
+        # the rollups and search stages refresh what topic_modeling.py would otherwise update itself
+        # --incremental fits a new online model when none is saved yet
+        "command": ["topic_modeling.py", "--incremental", "--no-derived"],
+        "refit": ["--refit"],
+        "deps": ["features"],
+        "inputs": DEDUPED + ["data/features"],
+        "outputs": RANKED + ["ml_models/topic_model.pkl"],
+        "code": ["topic_modeling.py"],
+    },
+    "classifier": {
+        "command": ["ml_models/train_classifier.py"],
+        "deps": ["features"],
+        "inputs": DEDUPED + ["data/features"],
+        "outputs": ["ml_models/problem_classifier.pkl", "ml_models/tfidf_vectorizer.pkl",
+                    "ml_models/artifacts/logistic_regression"],
+        "code": ["ml_models/train_classifier.py", "ml_models/artifacts.py", "ml_models/evaluation.py"],
+    },
+    "random_forest": {
+        "command": ["ml_models/train_random_forest.py"],
+        "deps": ["features"],
+        "inputs": DEDUPED + ["data/features"],
+        "outputs": ["ml_models/random_forest_classifier.pkl", "ml_models/rf_tfidf_vectorizer.pkl",
+                    "ml_models/artifacts/random_forest"],
+        "code": ["ml_models/train_random_forest.py", "ml_models/artifacts.py", "ml_models/evaluation.py"],
+    },
+    "compare_models": {
+        "command": ["ml_models/compare_models.py"],
+        "deps": ["features"],
+        "inputs": DEDUPED + ["data/features"],
+        "outputs": ["output/model_comparison.csv"],
+        "code": ["ml_models/compare_models.py"],
+    },
+    "clustering": {
+        "command": ["-c", "from visualizations.problem_clustering import run_clustering; run_clustering()"],
+        "deps": ["features"],
+        "inputs": DEDUPED + ["data/features"],
+        "outputs": ["data/clustering"],
+        "code": ["visualizations/problem_clustering.py"],
+    },
+    "cooccurrence": {
+        "command": ["visualizations/cooccurrence.py"],
+        "deps": ["dedup"],
+        "inputs": DEDUPED,
+        "outputs": ["output/top_pairs.csv", "data/cooccurrence"],
+        "code": ["visualizations/cooccurrence.py"],
+    },
+    "rollups": {
+        "command": ["rollups.py"],
+        "deps": ["topics"],
+        "inputs": RANKED,
+        "outputs": ["data/rollups"],
+        "code": ["rollups.py"],
+    },
+    "search": {
+        "command": ["search_index.py"],
+        "deps": ["topics"],
+        "inputs": RANKED,
+        "outputs": ["data/search_index.sqlite", "data/search_index.sqlite-wal", "data/search_index.sqlite-shm"],
+        "code": ["search_index.py"],
+    },
+    "trends": {
+        "command": ["visualizations/trends_and_insights.py"],
+        "deps": ["rollups", "dedup"],
+        "inputs": DEDUPED + ["data/rollups"],
+        "outputs": ["visualizations/posts_over_time.png", "visualizations/posts_by_subreddit.png",
+                    "visualizations/problem_rate_by_subreddit.png", "visualizations/top_words_problem_posts.png"],
+        "code": ["visualizations/trends_and_insights.py"],
+    },
+}
+
+class FileHasher:
+    """Content hashes of files and directories, reusing a file's hash while its size and mtime are unchanged."""
+
+    def __init__(self, known=None):
+        self.known = known or {}
+
+    def file(self, path):
+        stat = os.stat(path)
+        key = f"{stat.st_size}:{stat.st_mtime_ns}"
+        cached = self.known.get(path)
+        if cached and cached["stat"] == key:
+            return cached["sha1"]
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        self.known[path] = {"stat": key, "sha1": digest.hexdigest()}
+        return digest.hexdigest()
+
+    def path(self, path):
+        """Hash of a file, a directory tree (names and contents) or a missing path."""
+        if os.path.isdir(path):
+            digest = hashlib.sha1()
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    full = os.path.join(root, name)
+                    digest.update(f"{os.path.relpath(full, path)}:{self.file(full)}\n".encode())
+            return digest.hexdigest()
+        if os.path.exists(path):
+            return self.file(path)
+        return "missing"
+
+    def combined(self, paths):
+        digest = hashlib.sha1()
+        for path in paths:
+            digest.update(f"{path}:{self.path(path)}\n".encode())
+        return digest.hexdigest()
+
+def load_state(path=STATE_PATH):
+    if not os.path.exists(path):
+        return {"stages": {}, "files": {}}
+    with open(path) as f:
+        return json.load(f)
+
+def save_state(state, path=STATE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+def _module_files(name):
+    """Project files run by `import name`: the module itself and the packages above it."""
+    parts = name.split(".")
+    files = []
+    for i in range(1, len(parts) + 1):
+        base = os.path.join(*parts[:i])
+        for candidate in (os.path.join(base, "__init__.py"), f"{base}.py"):
+            if os.path.isfile(os.path.join(PROJECT_DIR, candidate)):
+                files.append(candidate)
+                break
+    return files
+
+def stage_code(stage):
+    """
+    The stage's declared code files plus every project module they import,
+    directly or through other project modules (imports inside functions too).
+    """
+    found = []
+    queue = [*stage["code"], stage["command"][0]] if stage["command"][0] != "-c" else list(stage["code"])
+    while queue:
+        path = queue.pop()
+        if path in found:
+            continue
+        found.append(path)
+        full = os.path.join(PROJECT_DIR, path)
+        if not path.endswith(".py") or not os.path.isfile(full):
+            continue
+        with open(full) as f:
+            tree = ast.parse(f.read(), full)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                # `from package import module` imports a module, `from module import name` doesn't
+                names = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+            else:
+                continue
+            for name in names:
+                queue.extend(_module_files(name))
+    return sorted(found)
+
+def input_hash(stage, hasher):
+    code = [os.path.join(PROJECT_DIR, path) for path in stage_code(stage)]
+    digest = hasher.combined(stage["inputs"]) + ":" + hasher.combined(code)
+    env = stage.get("env")
+    if env:
+        settings = {name: os.environ.get(name) or default for name, default in sorted(env.items())}
+        digest += ":" + hashlib.sha1(json.dumps(settings).encode()).hexdigest()
+    return digest
+
+def is_current(name, state, hasher, refit=False):
+    """True when the last run of the stage saw the same inputs and code and left the outputs as they are now."""
+    stage = STAGES[name]
+    record = state["stages"].get(name)
+    if stage.get("always") or record is None or (refit and stage.get("refit")):
+        return False
+    return (record["inputs"] == input_hash(stage, hasher)
+            and record["outputs"] == hasher.combined(stage["outputs"]))
+
+def selected_stages(only=None, skip=()):
+    """Requested stages (default: all) in dependency order, without the skipped ones."""
+    order = []
+
+    def visit(name):
+        if name in order:
+            return
+        for dep in STAGES[name]["deps"]:
+            visit(dep)
+        order.append(name)
+
+    for name in only or STAGES:
+        if name not in STAGES:
+            raise ValueError(f"Unknown stage {name!r}; stages are: {', '.join(STAGES)}")
+        visit(name)
+    return [name for name in order if name not in skip]
+
+def stage_command(stage, refit=False):
+    """The stage's command line, with its refit arguments when a refit was asked for."""
+    command = list(stage["command"])
+    if command[0] != "-c":
+        command[0] = os.path.join(PROJECT_DIR, command[0])
+    if refit:
+        command.extend(stage.get("refit", []))
+    return command
+
+def run_stage(name, refit=False):
+    """Run one stage as its own process; returns (returncode, wall seconds)."""
+    command = stage_command(STAGES[name], refit)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [PROJECT_DIR, os.environ.get("PYTHONPATH")])))
+
+    os.makedirs(LOG_DIR, exist_ok=True)
+    began = time.perf_counter()
+    with open(os.path.join(LOG_DIR, f"{name}.log"), "w") as log:
+        result = subprocess.run([sys.executable, *command], stdout=log, stderr=subprocess.STDOUT, env=env)
+    return result.returncode, time.perf_counter() - began
+
+def run(only=None, skip=(), force=False, jobs=4, dry_run=False, refit=False):
+    """Run the out-of-date stages, in parallel where the DAG allows. Returns {stage: outcome}."""
+    names = selected_stages(only, skip)
+    state = load_state()
+    hasher = FileHasher(state.get("files"))
+    outcomes = {}
+    timings = {}
+
+    if dry_run:
+        will_run = set()
+        for name in names:
+            if force or not is_current(name, state, hasher, refit):
+                will_run.add(name)
+                print(f"{name:<15} will run")
+            elif will_run.intersection(STAGES[name]["deps"]):
+                will_run.add(name)
+                print(f"{name:<15} runs if its dependencies change their outputs")
+            else:
+                print(f"{name:<15} up to date")
+        return {}
+
+    pending = list(names)
+    running = {}
+    started = {}  # input hashes as they were when each stage started
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            for name in list(pending):
+                deps = [dep for dep in STAGES[name]["deps"] if dep in names]
+                if any(outcomes.get(dep) in ("failed", "blocked") for dep in deps):
+                    outcomes[name] = "blocked"
+                    pending.remove(name)
+                    print(f"⏭️  {name}: not run, a dependency failed")
+                elif all(dep in outcomes for dep in deps):
+                    pending.remove(name)
+                    if not force and is_current(name, state, hasher, refit):
+                        outcomes[name] = "cached"
+                        print(f"✅ {name}: up to date")
+                        continue
+                    print(f"▶️  {name}: running")
+                    started[name] = input_hash(STAGES[name], hasher)
+                    running[pool.submit(run_stage, name, refit)] = name
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                returncode, seconds = future.result()
+                timings[name] = round(seconds, 2)
+                if returncode != 0:
+                    outcomes[name] = "failed"
+                    print(f"❌ {name}: failed after {seconds:.1f}s, see {LOG_DIR}/{name}.log")
+                    continue
+                stage = STAGES[name]
+                state["stages"][name] = {
+                    "inputs": started[name],
+                    "outputs": hasher.combined(stage["outputs"]),
+                    "seconds": timings[name],
+                    "finished_utc": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                }
+                state["files"] = hasher.known
+                save_state(state)
+                outcomes[name] = "ran"
+                print(f"✅ {name}: done in {seconds:.1f}s")
+
+    print("\nStage           Result   Seconds")
+    for name in names:
+        print(f"{name:<15} {outcomes.get(name, '-'):<8} {timings.get(name, ''):>7}")
+    return outcomes
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog="innomine", description="Run the Innomine pipeline.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for command, help_text in [("run", "run every out-of-date stage"), ("status", "show which stages would run")]:
+        sub = commands.add_parser(command, help=help_text)
+        sub.add_argument("stages", nargs="*", help=f"only these stages and what they depend on ({', '.join(STAGES)})")
+        sub.add_argument("--skip", nargs="+", action="extend", default=[], help="leave these stages out, e.g. --skip scrape")
+        sub.add_argument("--force", action="store_true", help="run stages even if they are up to date")
+        sub.add_argument("--jobs", type=int, default=4, help="stages run at the same time")
+        sub.add_argument("--refit", action="store_true",
+                         help="refit the topic model from scratch instead of updating the saved one")
+        sub.add_argument("--profile", choices=["cprofile", "pyinstrument"],
+                         help="profile each stage's instrumented blocks into data/profiles/")
+        sub.add_argument("--sentiment", choices=["textblob", "lexicon"],
+                         help="sentiment backend the clean stage labels posts with (default: $INNOMINE_SENTIMENT "
+                              "or textblob)")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.profile:
+        # read by instrumentation.measure() in every stage process
+        os.environ["INNOMINE_PROFILE"] = args.profile
+    if args.sentiment:
+        # read by sentiment.get_backend() in the clean stage, and part of its input hash
+        os.environ["INNOMINE_SENTIMENT"] = args.sentiment
+    outcomes = run(args.stages, args.skip, args.force, args.jobs, dry_run=args.command == "status",
+                   refit=args.refit)
+    if any(outcome in ("failed", "blocked") for outcome in outcomes.values()):
+        sys.exit(1)
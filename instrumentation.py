@@ -0,0 +1,174 @@
+# instrumentation.py
+#
+# Timing and memory records for the pipeline's hot paths. Wrap a block:
+#
+#   with measure("clean.chunk", rows=len(chunk)) as record:
+#       ...
+#
+# and on exit one JSON line is appended to data/metrics.jsonl:
+#
+#   {"name": "clean.chunk", "ts": "2025-05-06T09:32:31Z", "pid": 1234, "wall_s": 1.21,
+#    "cpu_s": 1.18, "rows": 10000, "rows_per_s": 8264.5, "peak_rss_mb": 412.5}
+#
+# Environment switches (inherited by worker and pipeline stage processes):
+#   INNOMINE_METRICS=<path>                 where records go ("-" for stderr, "off" to disable)
+#   INNOMINE_PROFILE=cprofile|pyinstrument  also profile every outermost block into data/profiles/
+#
+# `python instrumentation.py` summarises the records per name.
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+METRICS_PATH = "data/metrics.jsonl"
+PROFILE_DIR = "data/profiles"
+
+_lock = threading.Lock()
+_open = []  # peak-RSS bookkeeping of the blocks currently open in this process
+
+def reset_peak_rss():
+    """Reset the process' resident-memory high-water mark (Linux only; elsewhere a no-op)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+def peak_rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS, and is never reset
+    import resource
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / 2**20 if sys.platform == "darwin" else maxrss / 1024
+
+def metrics_path():
+    return os.environ.get("INNOMINE_METRICS", METRICS_PATH)
+
+def emit(record):
+    """Append one record as a JSON line (a single write, so lines from several processes don't interleave)."""
+    path = metrics_path()
+    if path == "off":
+        return
+    line = json.dumps(record, default=str) + "\n"
+    if path == "-":
+        sys.stderr.write(line)
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with _lock, open(path, "a") as f:
+        f.write(line)
+
+def _start_profiler():
+    mode = os.environ.get("INNOMINE_PROFILE", "").lower()
+    if mode == "cprofile":
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return mode, profiler
+    if mode == "pyinstrument":
+        from pyinstrument import Profiler
+        profiler = Profiler()
+        profiler.start()
+        return mode, profiler
+    return None, None
+
+def _stop_profiler(mode, profiler, name):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stem = os.path.join(PROFILE_DIR, f"{name}-{os.getpid()}-{int(time.time())}")
+    if mode == "cprofile":
+        profiler.disable()
+        profiler.dump_stats(f"{stem}.prof")
+        return f"{stem}.prof"
+    profiler.stop()
+    with open(f"{stem}.html", "w") as f:
+        f.write(profiler.output_html())
+    return f"{stem}.html"
+
+@contextmanager
+def measure(name, rows=None, **fields):
+    """
+    Record wall time, CPU time, rows, throughput and peak RSS of the block.
+    Set record["rows"] inside the block when the count is only known at the end;
+    any other keys added to the record are written as well.
+    """
+    record = {"name": name, **fields}
+    if rows is not None:
+        record["rows"] = rows
+
+    # the high-water mark is process-wide: before resetting it for this block,
+    # hand the peak so far to the blocks that are already open
+    with _lock:
+        outermost = not _open
+        peak = peak_rss_mb()
+        for frame in _open:
+            frame["peak"] = max(frame["peak"], peak)
+        frame = {"peak": 0.0}
+        _open.append(frame)
+        reset_peak_rss()
+
+    mode, profiler = _start_profiler() if outermost else (None, None)
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield record
+    finally:
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        with _lock:
+            _open.remove(frame)
+            peak = max(frame["peak"], peak_rss_mb())
+        if profiler is not None:
+            record["profile"] = _stop_profiler(mode, profiler, name)
+
+        record.update({
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "pid": os.getpid(),
+            "wall_s": round(wall, 4),
+            "cpu_s": round(cpu, 4),
+            "peak_rss_mb": round(peak, 1),
+        })
+        if record.get("rows") is not None:
+            record["rows_per_s"] = round(record["rows"] / wall, 1) if wall > 0 else None
+        emit(record)
+
+def read_metrics(path=None):
+    import pandas as pd
+
+    path = path or metrics_path()
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    return pd.read_json(path, lines=True)
+
+def summarize(path=None, last=None):
+    """Per-name count, median/max wall time, median throughput and max peak RSS."""
+    df = read_metrics(path)
+    if df.empty:
+        return df
+    if last:
+        df = df.groupby("name").tail(last)
+    for column in ("rows_per_s", "cpu_s"):
+        if column not in df.columns:
+            df[column] = float("nan")
+    return df.groupby("name").agg(
+        runs=("wall_s", "size"),
+        wall_s_median=("wall_s", "median"),
+        wall_s_max=("wall_s", "max"),
+        cpu_s_median=("cpu_s", "median"),
+        rows_per_s_median=("rows_per_s", "median"),
+        peak_rss_mb_max=("peak_rss_mb", "max"),
+    ).round(3)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarise the recorded pipeline metrics.")
+    parser.add_argument("--path", default=None, help=f"metrics file (default: {METRICS_PATH})")
+    parser.add_argument("--last", type=int, default=None, help="only the last N records per name")
+    args = parser.parse_args()
+    summary = summarize(args.path, args.last)
+    print(summary.to_string() if not summary.empty else "No metrics recorded yet.")
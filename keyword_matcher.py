@@ -0,0 +1,74 @@
+# keyword_matcher.py
+
+import re
+
+try:
+    import ahocorasick  # pyahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+def _trie_pattern(node):
+    """Regex for a keyword trie; shared prefixes are matched once instead of per keyword."""
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if "" in node:
+        # a keyword ends here; longer keywords are tried first (greedy)
+        body = f"(?:{body})?"
+    return body
+
+
+class KeywordMatcher:
+    """
+    Compiled multi-keyword substring matcher.
+    find_all() returns the same keywords as `[kw for kw in keywords if kw in text]`
+    but walks the text once, however many keywords there are. Uses an
+    Aho-Corasick automaton when pyahocorasick is installed, otherwise a
+    single trie-shaped regex.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = [kw for kw in dict.fromkeys(keywords) if kw]
+        self._order = {kw: i for i, kw in enumerate(self.keywords)}
+
+        if ahocorasick is not None and self.keywords:
+            self._automaton = ahocorasick.Automaton()
+            for i, kw in enumerate(self.keywords):
+                self._automaton.add_word(kw, i)
+            self._automaton.make_automaton()
+            return
+
+        self._automaton = None
+        trie = {}
+        for kw in self.keywords:
+            node = trie
+            for char in kw:
+                node = node.setdefault(char, {})
+            node[""] = {}
+        self._pattern = re.compile(_trie_pattern(trie) or "(?!)")  # (?!) never matches
+        # the regex reports the longest keyword starting at a position; shorter
+        # keywords starting there too are its prefixes
+        self._prefixes = {kw: [other for other in self.keywords if kw.startswith(other)] for kw in self.keywords}
+
+    def search(self, text):
+        """True if any keyword occurs in text."""
+        if self._automaton is not None:
+            return next(self._automaton.iter(text), None) is not None
+        return self._pattern.search(text) is not None
+
+    def find_all(self, text):
+        """Every keyword occurring in text, in keyword-list order."""
+        if self._automaton is not None:
+            found = {i for _, i in self._automaton.iter(text)}
+            return [self.keywords[i] for i in sorted(found)]
+
+        found = set()
+        search = self._pattern.search
+        match = search(text)
+        while match is not None:
+            found.update(self._prefixes[match.group()])
+            # restart one character later so overlapping keywords are seen
+            match = search(text, match.start() + 1)
+        return sorted(found, key=self._order.__getitem__)
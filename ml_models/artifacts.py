@@ -0,0 +1,180 @@
+# ml_models/artifacts.py
+#
+# Lean, fast-loading export of the trained classifiers. Instead of pickling
+# whole sklearn objects, an artifact directory holds plain .npy arrays (loaded
+# memory-mapped) plus a JSON manifest and vocabulary:
+#
+#   ml_models/artifacts/<name>/
+#       manifest.json    kind, format version, model version, training data hash
+#       vocabulary.json  TF-IDF terms in column order
+#       idf.npy          TF-IDF idf weights
+#       coef.npy, intercept.npy                       (logistic regression)
+#       left.npy, right.npy, feature.npy,
+#       threshold.npy, proba.npy, roots.npy           (random forest, all trees flattened)
+
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+ARTIFACT_DIR = "ml_models/artifacts"
+FORMAT_VERSION = 1
+
+# Vectorizer settings that affect transform(); everything else only matters when fitting
+VECTORIZER_PARAMS = [
+    "lowercase", "strip_accents", "analyzer", "token_pattern", "stop_words", "ngram_range",
+    "binary", "norm", "use_idf", "smooth_idf", "sublinear_tf",
+]
+
+class LeanLogisticRegression:
+    """predict/predict_proba of a binary LogisticRegression from its raw coefficients."""
+
+    def __init__(self, coef, intercept, classes):
+        self.coef_ = coef
+        self.intercept_ = intercept
+        self.classes_ = classes
+
+    def decision_function(self, X):
+        return np.asarray(X @ self.coef_[0]).ravel() + self.intercept_[0]
+
+    def predict_proba(self, X):
+        positive = 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X):
+        return self.classes_[(self.decision_function(X) > 0).astype(int)]
+
+class LeanRandomForest:
+    """
+    predict/predict_proba of a RandomForestClassifier from flattened tree arrays.
+    All trees are walked together, one level per step, with numpy gathers.
+    """
+
+    def __init__(self, left, right, feature, threshold, proba, roots, classes):
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.proba = proba
+        self.roots = roots
+        self.classes_ = classes
+
+    def predict_proba(self, X, batch_size=1024):
+        out = []
+        for start in range(0, X.shape[0], batch_size):
+            batch = X[start:start + batch_size]
+            # sklearn trees compare float32 feature values
+            dense = np.asarray(batch.toarray() if hasattr(batch, "toarray") else batch, dtype=np.float32)
+            rows = np.arange(dense.shape[0])[:, None]
+            nodes = np.broadcast_to(self.roots, (dense.shape[0], len(self.roots))).copy()
+            while True:
+                internal = self.left[nodes] != -1
+                if not internal.any():
+                    break
+                values = dense[rows, np.where(internal, self.feature[nodes], 0)]
+                go_left = values <= self.threshold[nodes]
+                nodes = np.where(internal, np.where(go_left, self.left[nodes], self.right[nodes]), nodes)
+            out.append(self.proba[nodes].mean(axis=1))
+        return np.vstack(out) if out else np.empty((0, len(self.classes_)))
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+def _flatten_forest(forest):
+    """Concatenate every tree's node arrays, with child indices offset into the shared arrays."""
+    left, right, feature, threshold, proba, roots = [], [], [], [], [], []
+    offset = 0
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        is_leaf = tree.children_left == -1
+        left.append(np.where(is_leaf, -1, tree.children_left + offset))
+        right.append(np.where(is_leaf, -1, tree.children_right + offset))
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(tree.threshold)
+        # normalise leaf values the same way DecisionTreeClassifier.predict_proba does
+        value = tree.value[:, 0, :]
+        total = value.sum(axis=1, keepdims=True)
+        proba.append(value / np.where(total == 0, 1, total))
+        roots.append(offset)
+        offset += tree.node_count
+    return {
+        "left": np.concatenate(left).astype(np.int64),
+        "right": np.concatenate(right).astype(np.int64),
+        "feature": np.concatenate(feature).astype(np.int64),
+        "threshold": np.concatenate(threshold),
+        "proba": np.concatenate(proba),
+        "roots": np.array(roots, dtype=np.int64),
+    }
+
+def _model_arrays(model):
+    kind = type(model).__name__
+    if kind == "LogisticRegression":
+        if len(model.classes_) != 2:
+            raise ValueError("Only binary logistic regression can be exported")
+        return "logistic_regression", {"coef": model.coef_, "intercept": model.intercept_}
+    if kind == "RandomForestClassifier":
+        return "random_forest", _flatten_forest(model)
+    raise ValueError(f"No lean artifact format for {kind}")
+
+def export_artifact(name, model, vectorizer, data_version, directory=ARTIFACT_DIR):
+    """Write a lean artifact for a trained model and its TF-IDF vectorizer."""
+    kind, arrays = _model_arrays(model)
+    path = os.path.join(directory, name)
+    os.makedirs(path, exist_ok=True)
+
+    for key, array in arrays.items():
+        np.save(os.path.join(path, f"{key}.npy"), np.ascontiguousarray(array))
+    np.save(os.path.join(path, "idf.npy"), vectorizer.idf_)
+    with open(os.path.join(path, "vocabulary.json"), "w") as f:
+        json.dump(vectorizer.get_feature_names_out().tolist(), f)
+
+    params = vectorizer.get_params()
+    manifest = {
+        "name": name,
+        "kind": kind,
+        "format_version": FORMAT_VERSION,
+        "model_version": f"{kind}-{data_version}",
+        "data_version": data_version,
+        "created_utc": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "classes": model.classes_.tolist(),
+        "vectorizer": {key: list(params[key]) if isinstance(params[key], tuple) else params[key]
+                       for key in VECTORIZER_PARAMS},
+    }
+    with open(os.path.join(path, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"Lean artifact {manifest['model_version']} written to {path}/")
+    return manifest
+
+def load_manifest(name, directory=ARTIFACT_DIR):
+    with open(os.path.join(directory, name, "manifest.json")) as f:
+        return json.load(f)
+
+def load_artifact(name, directory=ARTIFACT_DIR, mmap=True):
+    """Load (model, vectorizer, manifest) from a lean artifact; arrays are memory-mapped."""
+    path = os.path.join(directory, name)
+    manifest = load_manifest(name, directory)
+    if manifest["format_version"] != FORMAT_VERSION:
+        raise ValueError(f"Artifact {name} has format {manifest['format_version']}, expected {FORMAT_VERSION}")
+    mode = "r" if mmap else None
+
+    def array(key):
+        return np.load(os.path.join(path, f"{key}.npy"), mmap_mode=mode)
+
+    with open(os.path.join(path, "vocabulary.json")) as f:
+        vocabulary = {term: i for i, term in enumerate(json.load(f))}
+    params = dict(manifest["vectorizer"])
+    params["ngram_range"] = tuple(params["ngram_range"])
+    vectorizer = TfidfVectorizer(vocabulary=vocabulary, **params)
+    vectorizer.idf_ = np.asarray(array("idf"))
+
+    classes = np.array(manifest["classes"])
+    if manifest["kind"] == "logistic_regression":
+        model = LeanLogisticRegression(array("coef"), array("intercept"), classes)
+    elif manifest["kind"] == "random_forest":
+        model = LeanRandomForest(array("left"), array("right"), array("feature"), array("threshold"),
+                                 array("proba"), array("roots"), classes)
+    else:
+        raise ValueError(f"Unknown artifact kind {manifest['kind']}")
+    return model, vectorizer, manifest
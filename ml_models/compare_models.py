@@ -1,36 +1,107 @@
+import os
+import sys
+import time
+import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.feature_extraction.text import TfidfVectorizer
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.model_selection import StratifiedKFold
 from sklearn.linear_model import LogisticRegression
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import classification_report, confusion_matrix
-
-# Load data
-df = pd.read_csv("data/cleaned_labeled_posts.csv")
-X = df["clean_text"].fillna("")
-y = df["problem_signal"]
-
-# Vectorize text
-vectorizer = TfidfVectorizer(max_features=1000)
-X_vec = vectorizer.fit_transform(X)
-
-# Split
-X_train, X_test, y_train, y_test = train_test_split(X_vec, y, test_size=0.2, random_state=42)
-
-# Models
-models = {
-    "Logistic Regression": LogisticRegression(max_iter=1000),
-    "Naive Bayes": MultinomialNB(),
-    "Random Forest": RandomForestClassifier(n_estimators=100, random_state=42)
-}
-
-# Run evaluation
-for name, model in models.items():
-    print(f"\n Testing: {name}")
-    model.fit(X_train, y_train)
-    y_pred = model.predict(X_test)
-    print(" Classification Report:\n", classification_report(y_test, y_pred))
-    print(" Confusion Matrix:\n", confusion_matrix(y_test, y_pred))
-    cv_score = cross_val_score(model, X_vec, y, cv=5, scoring="f1").mean()
-    print(f" Cross-Validated F1 Score: {cv_score:.2f}")
+from sklearn.metrics import classification_report, confusion_matrix, f1_score
+
+# make the project root importable when run as `python ml_models/<script>.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from feature_store import load_features
+from instrumentation import measure, peak_rss_mb, reset_peak_rss
+from tables import load_table
+
+RESULTS_PATH = "output/model_comparison.csv"
+
+def default_models():
+    return {
+        "Logistic Regression": LogisticRegression(max_iter=1000),
+        "Naive Bayes": MultinomialNB(),
+        "Random Forest": RandomForestClassifier(n_estimators=100, random_state=42)
+    }
+
+def make_folds(y, cv=5):
+    """Stratified folds computed once and shared by every model (same splits as cross_val_score)."""
+    return list(StratifiedKFold(n_splits=cv).split(np.zeros(len(y)), y))
+
+def run_fold(model, X, y, train_idx, test_idx):
+    """Fit and score one model on one fold; returns predictions, timings and peak RSS of the worker."""
+    reset_peak_rss()
+    start = time.perf_counter()
+    model.fit(X[train_idx], y[train_idx])
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = model.predict(X[test_idx])
+    predict_time = time.perf_counter() - start
+    return y_pred, fit_time, predict_time, peak_rss_mb()
+
+def compare_models(models, X, y, folds, n_jobs=-1):
+    """
+    Run every model on every fold concurrently. Returns a metrics table (one
+    row per model) and the out-of-fold predictions of each model.
+    """
+    y = np.asarray(y)
+    jobs = [(name, fold) for name in models for fold in range(len(folds))]
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(run_fold)(clone(models[name]), X, y, *folds[fold]) for name, fold in jobs
+    )
+
+    rows = []
+    predictions = {}
+    for name in models:
+        oof = np.empty_like(y)
+        fold_f1, fit_time, predict_time, peak = [], 0.0, 0.0, 0.0
+        for (job_name, fold), (y_pred, fit_s, predict_s, peak_mb) in zip(jobs, results):
+            if job_name != name:
+                continue
+            test_idx = folds[fold][1]
+            oof[test_idx] = y_pred
+            fold_f1.append(f1_score(y[test_idx], y_pred))
+            fit_time += fit_s
+            predict_time += predict_s
+            peak = max(peak, peak_mb)
+        predictions[name] = oof
+        rows.append({
+            "model": name,
+            "cv_f1": np.mean(fold_f1),
+            "fit_seconds": fit_time,
+            "predict_seconds": predict_time,
+            "peak_rss_mb": peak,
+        })
+    return pd.DataFrame(rows), predictions
+
+def main():
+    # Load data
+    df = load_table("data/deduped_posts.csv", ["problem_signal"])
+    y = df["problem_signal"].to_numpy()
+
+    # Vectorize text (shared feature store)
+    X_vec, vectorizer = load_features("top1000")
+
+    # Run evaluation
+    models = default_models()
+    folds = make_folds(y)
+    with measure("compare_models", rows=len(y), models=len(models), folds=len(folds)):
+        metrics, predictions = compare_models(models, X_vec, y, folds)
+
+    for name, y_pred in predictions.items():
+        print(f"\n Testing: {name}")
+        print(" Classification Report (out-of-fold):\n", classification_report(y, y_pred))
+        print(" Confusion Matrix:\n", confusion_matrix(y, y_pred))
+        cv_score = metrics.loc[metrics["model"] == name, "cv_f1"].iloc[0]
+        print(f" Cross-Validated F1 Score: {cv_score:.2f}")
+
+    print("\n", metrics.round(3).to_string(index=False))
+    os.makedirs("output", exist_ok=True)
+    metrics.to_csv(RESULTS_PATH, index=False)
+    print(f"\nComparison saved to {RESULTS_PATH}")
+
+if __name__ == "__main__":
+    main()
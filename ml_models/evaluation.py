@@ -0,0 +1,63 @@
+# ml_models/evaluation.py
+#
+# Evaluation bundle written at training time so the Model Metrics page can
+# render without loading models or re-scoring the corpus.
+
+import json
+import os
+
+import numpy as np
+from sklearn.metrics import average_precision_score, classification_report, confusion_matrix, precision_recall_curve
+
+from ml_models.artifacts import ARTIFACT_DIR
+
+PR_CURVE_POINTS = 200
+
+def downsample(*arrays, n_points=PR_CURVE_POINTS):
+    """Evenly spaced subset of curve points, always keeping both ends."""
+    size = len(arrays[0])
+    if size <= n_points:
+        return [np.asarray(a).tolist() for a in arrays]
+    index = np.unique(np.linspace(0, size - 1, n_points).round().astype(int))
+    return [np.asarray(a)[index].tolist() for a in arrays]
+
+def build_evaluation(model, X, y_true, model_version):
+    """Classification report, confusion matrix and downsampled PR curve for one model."""
+    y_pred = model.predict(X)
+    labels = model.classes_
+    bundle = {
+        "model_version": model_version,
+        "n_samples": int(X.shape[0]),
+        "labels": np.asarray(labels).tolist(),
+        "classification_report": classification_report(y_true, y_pred, output_dict=True),
+        "confusion_matrix": confusion_matrix(y_true, y_pred, labels=labels).tolist(),
+    }
+    if hasattr(model, "predict_proba"):
+        positive = list(labels).index(True)
+        y_scores = model.predict_proba(X)[:, positive]
+        precision, recall, _ = precision_recall_curve(y_true, y_scores)
+        precision, recall = downsample(precision, recall)
+        bundle["pr_curve"] = {
+            "precision": precision,
+            "recall": recall,
+            "average_precision": float(average_precision_score(y_true, y_scores)),
+        }
+    return bundle
+
+def evaluation_path(name, directory=ARTIFACT_DIR):
+    return os.path.join(directory, name, "evaluation.json")
+
+def save_evaluation(name, bundle, directory=ARTIFACT_DIR):
+    path = evaluation_path(name, directory)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(bundle, f)
+    print(f"Evaluation bundle for {bundle['model_version']} saved to {path}")
+
+def load_evaluation(name, directory=ARTIFACT_DIR):
+    """The saved bundle, or None if there is none."""
+    path = evaluation_path(name, directory)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
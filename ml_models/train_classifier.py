@@ -1,35 +1,42 @@
-import pandas as pd
 from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import classification_report, confusion_matrix
 import joblib
 import os
+import sys
+
+# make the project root importable when run as `python ml_models/<script>.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from feature_store import data_version, load_features
+from instrumentation import measure
+from tables import load_table
+from ml_models.artifacts import export_artifact
+from ml_models.evaluation import build_evaluation, save_evaluation
 
 # load cleaned and labeled data
-df_path = "data/cleaned_labeled_posts.csv"
+df_path = "data/deduped_posts.csv"
 if not os.path.exists(df_path):
-    raise FileNotFoundError(" cleaned_labeled_posts.csv not found in /data. Run text_cleaner.py first.")
+    raise FileNotFoundError(" deduped_posts.csv not found in /data. Run text_cleaner.py and dedup.py first.")
 
-df = pd.read_csv(df_path)
+df = load_table(df_path, ["problem_signal"])
 
-# prepare features and labels
-X = df["clean_text"].fillna("")
+# prepare labels
 y = df["problem_signal"]
 
-# vectorize text using TF-IDF
-vectorizer = TfidfVectorizer(max_df=0.95, min_df=2, stop_words="english")
-X_vec = vectorizer.fit_transform(X)
+# TF-IDF features from the shared feature store
+X_vec, vectorizer = load_features("english", df_path)
 
 # train-test split
 X_train, X_test, y_train, y_test = train_test_split(X_vec, y, test_size=0.2, random_state=42)
 
 # train model (Logistic Regression)
 model = LogisticRegression(max_iter=1000, class_weight="balanced")
-model.fit(X_train, y_train)
+with measure("train.logistic_regression.fit", rows=X_train.shape[0]):
+    model.fit(X_train, y_train)
 
 # evaluate model
-y_pred = model.predict(X_test)
+with measure("train.logistic_regression.predict", rows=X_test.shape[0]):
+    y_pred = model.predict(X_test)
 print("\n Classification Report:\n", classification_report(y_test, y_pred))
 print(" Confusion Matrix:\n", confusion_matrix(y_test, y_pred))
 
@@ -43,3 +50,9 @@ os.makedirs(output_dir, exist_ok=True)
 joblib.dump(model, f"{output_dir}/problem_classifier.pkl")
 joblib.dump(vectorizer, f"{output_dir}/tfidf_vectorizer.pkl")
 print("\n Model and vectorizer saved to /ml_models/")
+
+# lean, fast-loading artifact versioned by the training data hash
+manifest = export_artifact("logistic_regression", model, vectorizer, data_version(df_path))
+
+# evaluation bundle over the full labeled corpus for the Model Metrics page
+save_evaluation("logistic_regression", build_evaluation(model, X_vec, y, manifest["model_version"]))
@@ -1,36 +1,43 @@
-import pandas as pd
 import os
+import sys
 import joblib
 
 from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report, confusion_matrix
 
+# make the project root importable when run as `python ml_models/<script>.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from feature_store import data_version, load_features
+from instrumentation import measure
+from tables import load_table
+from ml_models.artifacts import export_artifact
+from ml_models.evaluation import build_evaluation, save_evaluation
+
 # load data
-df_path = "data/cleaned_labeled_posts.csv"
+df_path = "data/deduped_posts.csv"
 if not os.path.exists(df_path):
-    raise FileNotFoundError(" cleaned_labeled_posts.csv not found. Please run text_cleaner.py first.")
+    raise FileNotFoundError(" deduped_posts.csv not found. Please run text_cleaner.py and dedup.py first.")
 
-df = pd.read_csv(df_path)
+df = load_table(df_path, ["problem_signal"])
 
 # preprocess
-X = df["clean_text"].fillna("")
 y = df["problem_signal"]
 
-# vectorize
-vectorizer = TfidfVectorizer(max_features=1000)
-X_vec = vectorizer.fit_transform(X)
+# vectorize (shared feature store)
+X_vec, vectorizer = load_features("top1000", df_path)
 
 # train/Test Split
 X_train, X_test, y_train, y_test = train_test_split(X_vec, y, test_size=0.2, random_state=42)
 
 # train Random Forest Model
 model = RandomForestClassifier(n_estimators=100, random_state=42)
-model.fit(X_train, y_train)
+with measure("train.random_forest.fit", rows=X_train.shape[0]):
+    model.fit(X_train, y_train)
 
 # evaluate
-y_pred = model.predict(X_test)
+with measure("train.random_forest.predict", rows=X_test.shape[0]):
+    y_pred = model.predict(X_test)
 
 print("\n Classification Report:\n", classification_report(y_test, y_pred))
 print("Confusion Matrix:\n", confusion_matrix(y_test, y_pred))
@@ -44,3 +51,9 @@ os.makedirs("ml_models", exist_ok=True)
 joblib.dump(model, "ml_models/random_forest_classifier.pkl")
 joblib.dump(vectorizer, "ml_models/rf_tfidf_vectorizer.pkl")
 print(" Random Forest model and vectorizer saved to /ml_models/")
+
+# lean, fast-loading artifact versioned by the training data hash
+manifest = export_artifact("random_forest", model, vectorizer, data_version(df_path))
+
+# evaluation bundle over the full labeled corpus for the Model Metrics page
+save_evaluation("random_forest", build_evaluation(model, X_vec, y, manifest["model_version"]))
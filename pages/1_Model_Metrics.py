@@ -1,11 +1,15 @@
 # pages/1_Model_Metrics.py
 
+import os
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import joblib
-from sklearn.metrics import classification_report, confusion_matrix, ConfusionMatrixDisplay, precision_recall_curve, average_precision_score
+from ml_models.artifacts import load_artifact, load_manifest
+from ml_models.evaluation import build_evaluation, load_evaluation
+from instrumentation import measure
+from tables import load_table
 
 # Set Streamlit config
 st.set_page_config(page_title="Model Metrics", layout="wide")
@@ -16,64 +20,102 @@ st.title(" Classifier Performance Comparison")
 # Model files and labels
 model_info = {
     "Logistic Regression": {
+        "artifact": "logistic_regression",
         "model_path": "ml_models/problem_classifier.pkl",
         "vectorizer_path": "ml_models/tfidf_vectorizer.pkl"
     },
     "Random Forest": {
+        "artifact": "random_forest",
         "model_path": "ml_models/random_forest_classifier.pkl",
         "vectorizer_path": "ml_models/rf_tfidf_vectorizer.pkl"
     }
 }
 
-# Load labeled data
+def current_version(name, model_path, vectorizer_path):
+    """Version from the artifact manifest; without one, the pickles' size and mtime, so a retrain still shows."""
+    try:
+        return load_manifest(name)["model_version"]
+    except FileNotFoundError:
+        stats = [os.stat(path) for path in (model_path, vectorizer_path)]
+        return "pickle-" + "-".join(f"{stat.st_size}:{stat.st_mtime_ns}" for stat in stats)
+
+# Precomputed by the training scripts; keyed by model version so a retrain invalidates it
+@st.cache_data
+def load_bundle(name, model_version):
+    bundle = load_evaluation(name)
+    if bundle is None or bundle["model_version"] != model_version:
+        return None
+    return bundle
+
+# Prefer the lean artifact (fast, memory-mapped); fall back to the pickles.
+# model_version is only part of the cache key, so a retrained model is reloaded
+@st.cache_resource
+def load_model(name, model_path, vectorizer_path, model_version):
+    try:
+        model, vectorizer, _ = load_artifact(name)
+    except FileNotFoundError:
+        model = joblib.load(model_path)
+        vectorizer = joblib.load(vectorizer_path)
+    return model, vectorizer
+
+# Load labeled data (only needed when no bundle is available)
 @st.cache_data
 def load_data():
-    return pd.read_csv("data/cleaned_labeled_posts.csv")
+    with measure("app.metrics.load_data") as record:
+        df = load_table("data/deduped_posts.csv", ["clean_text", "problem_signal"])
+        record["rows"] = len(df)
+    return df
+
+# Live fallback: score the corpus once per model version
+@st.cache_data
+def evaluate_live(model_version, name, model_path, vectorizer_path):
+    model, vectorizer = load_model(name, model_path, vectorizer_path, model_version)
+    df = load_data()
+    X_vec = vectorizer.transform(df["clean_text"].fillna(""))
+    return build_evaluation(model, X_vec, df["problem_signal"], model_version)
+
+def render(bundle):
+    labels = bundle["labels"]
+
+    # Classification Report
+    report_df = pd.DataFrame(bundle["classification_report"]).transpose()
+    st.markdown("#### Classification Report")
+    st.dataframe(report_df.style.background_gradient(cmap="Blues"))
+
+    # Confusion Matrix
+    st.markdown("####  Confusion Matrix")
+    fig_cm, ax_cm = plt.subplots()
+    sns.heatmap(bundle["confusion_matrix"], annot=True, fmt="d", cmap="Purples", xticklabels=labels, yticklabels=labels)
+    ax_cm.set_xlabel("Predicted")
+    ax_cm.set_ylabel("Actual")
+    st.pyplot(fig_cm)
+    plt.close(fig_cm)
 
-df = load_data()
-X_text = df["clean_text"]
-y_true = df["problem_signal"]
+    # Precision-Recall Curve
+    if "pr_curve" in bundle:
+        st.markdown("####  Precision-Recall Curve")
+        pr = bundle["pr_curve"]
+        fig_pr, ax_pr = plt.subplots()
+        ax_pr.plot(pr["recall"], pr["precision"], label=f"Avg Precision = {pr['average_precision']:.2f}")
+        ax_pr.set_xlabel("Recall")
+        ax_pr.set_ylabel("Precision")
+        ax_pr.set_title("Precision-Recall Curve")
+        ax_pr.legend()
+        st.pyplot(fig_pr)
+        plt.close(fig_pr)
 
 # Visualization layout
 for model_name, paths in model_info.items():
     st.subheader(f"🔍 {model_name}")
 
     try:
-        model = joblib.load(paths["model_path"])
-        vectorizer = joblib.load(paths["vectorizer_path"])
-
-        X_vec = vectorizer.transform(X_text)
-        y_pred = model.predict(X_vec)
-
-        # Classification Report
-        report = classification_report(y_true, y_pred, output_dict=True)
-        report_df = pd.DataFrame(report).transpose()
-
-        st.markdown("#### Classification Report")
-        st.dataframe(report_df.style.background_gradient(cmap="Blues"))
-
-        # Confusion Matrix
-        st.markdown("####  Confusion Matrix")
-        cm = confusion_matrix(y_true, y_pred, labels=model.classes_)
-        fig_cm, ax_cm = plt.subplots()
-        sns.heatmap(cm, annot=True, fmt="d", cmap="Purples", xticklabels=model.classes_, yticklabels=model.classes_)
-        ax_cm.set_xlabel("Predicted")
-        ax_cm.set_ylabel("Actual")
-        st.pyplot(fig_cm)
-
-        # Precision-Recall Curve
-        if hasattr(model, "predict_proba"):
-            st.markdown("####  Precision-Recall Curve")
-            y_scores = model.predict_proba(X_vec)[:, 1]
-            precision, recall, _ = precision_recall_curve(y_true, y_scores)
-            avg_precision = average_precision_score(y_true, y_scores)
-            fig_pr, ax_pr = plt.subplots()
-            ax_pr.plot(recall, precision, label=f"Avg Precision = {avg_precision:.2f}")
-            ax_pr.set_xlabel("Recall")
-            ax_pr.set_ylabel("Precision")
-            ax_pr.set_title("Precision-Recall Curve")
-            ax_pr.legend()
-            st.pyplot(fig_pr)
+        model_version = current_version(paths["artifact"], paths["model_path"], paths["vectorizer_path"])
+        bundle = load_bundle(paths["artifact"], model_version)
+        if bundle is None:
+            bundle = evaluate_live(model_version, paths["artifact"], paths["model_path"], paths["vectorizer_path"])
+        else:
+            st.caption(f"Model version `{model_version}` · evaluated on {bundle['n_samples']} posts at training time")
+        render(bundle)
 
     except FileNotFoundError as e:
         st.warning(f" {model_name} model or vectorizer not found.")
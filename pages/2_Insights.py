@@ -1,22 +1,46 @@
 # pages/2_Insights.py
 
 import streamlit as st
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import networkx as nx
-from itertools import combinations
-from collections import Counter
+from instrumentation import measure
+from rollups import read_rollups, rollup_posts, select_rollups, topic_labels
+from tables import load_table
+from visualizations.cooccurrence import CooccurrenceIndex, load_top_pairs
 
 st.set_page_config(page_title="Insights & Trends", layout="wide")
 
 st.title("Developer Topic Insights")
 st.markdown("Explore what developers are struggling with based on topic frequency.")
 
+# Full ranked posts; only needed when the rollups / co-occurrence pairs haven't been built
+@st.cache_data
+def load_ranked():
+    with measure("app.insights.load_ranked") as record:
+        df = load_table("output/ranked_problems.csv", ["id", "created_utc", "subreddit", "problem_signal",
+                                                      "topic_id", "topic_keywords", "clean_text"])
+        record["rows"] = len(df)
+    return df
+
+# Post counts per topic, overall and per month, from the rollups table (rollups.py)
+def topic_counts():
+    rollups = read_rollups()
+    labels = topic_labels()
+    if rollups is None:
+        df = load_ranked()
+        rollups = rollup_posts(df)
+        labels = dict(zip(df["topic_id"].astype(str), df["topic_keywords"]))
+    total, monthly = (select_rollups(rollups, granularity, "topic_id") for granularity in ("total", "month"))
+    return (total.assign(topic_keywords=total["value"].map(labels)),
+            monthly.assign(topic_keywords=monthly["value"].map(labels)))
+
 try:
-    df = pd.read_csv("output/ranked_problems.csv")
+    total, monthly = topic_counts()
 
-    topic_freq = df["topic_keywords"].value_counts().reset_index()
+    # the "total" bucket also counts posts without a timestamp
+    topic_freq = (total.groupby("topic_keywords")["posts"].sum()
+                  .sort_values(ascending=False).reset_index())
     topic_freq.columns = ["Topic", "Count"]
 
     plt.figure(figsize=(10, 6))
@@ -28,18 +52,13 @@ try:
 
 except FileNotFoundError:
     st.error("ranked_problems.csv not found. Please run `topic_modeling.py` to generate it.")
+    st.stop()
 
 st.markdown("---")
 st.header("Topic Trends Over Time")
 
-if "created_utc" in df.columns:
-    # Convert to datetime
-    df["created_utc"] = pd.to_datetime(df["created_utc"], unit='s', errors='coerce')
-    df = df.dropna(subset=["created_utc"])
-
-    # Group by month and topic
-    df["month"] = df["created_utc"].dt.to_period("M").astype(str)
-    trend_data = df.groupby(["month", "topic_keywords"]).size().reset_index(name="count")
+if len(monthly):
+    trend_data = monthly.assign(month=monthly["bucket"].dt.strftime("%Y-%m"), count=monthly["posts"])
 
     # Show dropdown to filter by topic
     selected_topic = st.selectbox("Select a topic to see its trend:", trend_data["topic_keywords"].unique())
@@ -55,26 +74,24 @@ if "created_utc" in df.columns:
     st.pyplot(plt)
 
 else:
-    st.warning("`created_utc` column not found. Make sure your raw data includes timestamps.")
+    st.warning("No post timestamps found. Make sure your raw data includes `created_utc`.")
 
 st.markdown("---")
 st.header("Keyword Co-Occurrence Network")
 
-# Tokenize clean_text
-token_lists = df["clean_text"].dropna().apply(lambda x: x.split())
-
-# Generate pairs of words from each post
-pairs = []
-for tokens in token_lists:
-    pairs.extend(combinations(set(tokens), 2))
+# Fallback when visualizations/cooccurrence.py has not been run yet
+@st.cache_data
+def count_pairs(texts, n):
+    return CooccurrenceIndex().build(texts).top_pairs(n)
 
-# Count co-occurring pairs
-pair_counts = Counter(pairs)
-top_pairs = dict(pair_counts.most_common(30))  # top 30 pairs only
+# Precomputed top pairs (top 30 only)
+top_pairs = load_top_pairs(30)
+if top_pairs is None:
+    top_pairs = count_pairs(load_ranked()["clean_text"], 30)
 
 # Build graph
 G = nx.Graph()
-for (word1, word2), weight in top_pairs.items():
+for word1, word2, weight in top_pairs.itertuples(index=False):
     G.add_edge(word1, word2, weight=weight)
 
 # Plot
@@ -1,5 +1,8 @@
+import os
 import streamlit as st
 from visualizations.problem_clustering import run_clustering
+from feature_store import data_version
+from tables import DEDUPED_PATH
 import plotly.express as px
 import plotly.graph_objects as go
 
@@ -8,8 +11,16 @@ st.set_page_config(page_title="Problem Clustering", layout="wide")
 st.title(" Problem Clustering")
 st.markdown("We use **UMAP + KMeans** to group similar developer issues into semantic clusters.")
 
-# Load data
-df = run_clustering()
+# Load data (cached per data version, so interactions never refit)
+@st.cache_data
+def load_clusters(version):
+    return run_clustering()
+
+if not os.path.exists(DEDUPED_PATH):
+    st.warning("deduped_posts.csv not found. Please run `text_cleaner.py` and `dedup.py` to generate it.")
+    st.stop()
+
+df = load_clusters(data_version(DEDUPED_PATH))
 
 # Plot scatter chart
 fig = px.scatter(
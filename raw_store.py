@@ -0,0 +1,162 @@
+# raw_store.py
+
+import json
+import os
+import re
+
+RAW_STORE_PATH = "data/raw_posts.jsonl"
+LEGACY_JSON_PATH = "data/raw_data.json"
+
+# Schema written by reddit_scraper; readers always return these columns
+RAW_COLUMNS = ["id", "subreddit", "title", "text", "created_utc", "url", "score", "num_comments"]
+
+CHUNK_SIZE = 10000
+
+# ids of every stored post, per store path, with the store size they are valid for
+_ids_cache = {}
+
+
+def post_id(post):
+    """Reddit id of a stored post; older records only carry the permalink."""
+    if post.get("id"):
+        return post["id"]
+    match = re.search(r"/comments/([a-z0-9]+)", post.get("url", ""))
+    return match.group(1) if match else post.get("url")
+
+
+def migrate_legacy(path=RAW_STORE_PATH, legacy_path=LEGACY_JSON_PATH):
+    """Convert the old monolithic raw_data.json into the JSONL store, once."""
+    if os.path.exists(path) or not os.path.exists(legacy_path):
+        return 0
+    with open(legacy_path) as f:
+        posts = json.load(f)
+    for post in posts:
+        post["id"] = post_id(post)
+    print(f"Migrating {len(posts)} posts from {legacy_path} to {path}")
+    return append_posts(posts, path, dedup=False)
+
+
+def iter_posts(path=RAW_STORE_PATH):
+    """Stream posts one at a time. A torn last line from a crashed write is skipped."""
+    if path == RAW_STORE_PATH:
+        migrate_legacy(path)
+    if not os.path.exists(path):
+        return
+    with open(path) as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                print(f"⚠️ Skipping unreadable line {line_no} in {path}")
+
+
+def iter_chunks(path=RAW_STORE_PATH, chunksize=CHUNK_SIZE):
+    """Stream the store as DataFrames of at most `chunksize` posts."""
+    import pandas as pd
+
+    chunk = []
+    for post in iter_posts(path):
+        chunk.append(post)
+        if len(chunk) >= chunksize:
+            yield pd.DataFrame(chunk, columns=RAW_COLUMNS)
+            chunk = []
+    if chunk:
+        yield pd.DataFrame(chunk, columns=RAW_COLUMNS)
+
+
+def ids_path(path=RAW_STORE_PATH):
+    return f"{path}.ids"
+
+
+def _store_size(path):
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def _read_id_index(path):
+    """
+    Ids from the sidecar index, or None if it is missing or doesn't describe
+    the store as it is now. The sidecar holds one id per line, and after every
+    append a "#size <bytes>" line with the store's size at that point.
+    """
+    index = ids_path(path)
+    if not os.path.exists(index):
+        return None
+    ids, size = set(), None
+    with open(index) as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if line.startswith("#size "):
+                size = int(line[6:]) if line[6:].isdigit() else None
+            elif line:
+                ids.add(line)
+    return ids if size == _store_size(path) else None
+
+
+def _write_id_index(path, ids, append=False):
+    with open(ids_path(path), "a" if append else "w") as f:
+        f.write("".join(f"{key}\n" for key in ids if key is not None))
+        f.write(f"#size {_store_size(path)}\n")
+
+
+def _known_ids(path):
+    """
+    The (shared, cached) id set of the store. Read from the sidecar index next
+    to the store, which is rebuilt with a full scan only when it is missing or
+    out of date.
+    """
+    if not os.path.exists(path):
+        return set()
+    size = _store_size(path)
+    cached = _ids_cache.get(path)
+    if cached is not None and cached[0] == size:
+        return cached[1]
+    ids = _read_id_index(path)
+    if ids is None:
+        ids = {post_id(post) for post in iter_posts(path)}
+        _write_id_index(path, ids)
+    _ids_cache[path] = (size, ids)
+    return ids
+
+
+def load_ids(path=RAW_STORE_PATH):
+    return set(_known_ids(path))
+
+
+def append_posts(posts, path=RAW_STORE_PATH, dedup=True):
+    """
+    Append posts to the store without rewriting it.
+    With `dedup`, posts whose id is already stored are skipped.
+    Returns the number of posts written.
+    """
+    seen = _known_ids(path)
+    if dedup:
+        fresh, batch = [], set()
+        for post in posts:
+            key = post_id(post)
+            if key not in seen and key not in batch:
+                batch.add(key)
+                fresh.append(post)
+        posts = fresh
+    if not posts:
+        return 0
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "ab+") as f:
+        # a crash can leave a torn last line; start on a fresh one
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+        for post in posts:
+            f.write(json.dumps(post).encode("utf-8") + b"\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+    # keep the id index in step so the next append doesn't rescan the store
+    keys = [post_id(post) for post in posts]
+    _write_id_index(path, keys, append=True)
+    seen.update(keys)
+    _ids_cache[path] = (_store_size(path), seen)
+    return len(posts)
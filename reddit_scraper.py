@@ -1,8 +1,14 @@
-import praw
+import argparse
 import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from config import reddit  # Assumes you've stored credentials in config.py
+
+import raw_store
+from instrumentation import measure
+from keyword_matcher import KeywordMatcher
 
 # List of subreddits to scrape
 SUBREDDITS = [
@@ -12,45 +18,197 @@ SUBREDDITS = [
 ]
 
 KEYWORDS = ["error", "issue", "stuck", "bug", "help", "can't", "frustrated", "how do I"]
+KEYWORD_MATCHER = KeywordMatcher(KEYWORDS)
 
 DAYS_LIMIT = 30
 LIMIT_PER_SUB = 100
+# reddit listings stop at ~1000 items; used as the cap once a checkpoint exists
+MAX_INCREMENTAL_POSTS = 1000
+
+# Concurrent fetch settings
+MAX_WORKERS = 8
+REQUESTS_PER_MINUTE = 60  # shared by every worker in a run
+PAGE_SIZE = 100  # praw pulls listings 100 items per API request
+
+CHECKPOINT_PATH = "data/scrape_checkpoints.json"
+
+
+class RateLimiter:
+    """
+    Token bucket shared by all scraper workers in a run.
+    `budget` optionally caps the total number of requests for the run;
+    once it is spent, acquire() returns False and workers stop paging.
+    """
+
+    def __init__(self, rate=REQUESTS_PER_MINUTE, period=60.0, burst=None, budget=None):
+        self.rate = rate / period
+        self.capacity = burst if burst is not None else max(1, min(rate, MAX_WORKERS))
+        self.budget = budget
+        self.calls = 0
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                if self.budget is not None and self.calls >= self.budget:
+                    return False
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self.calls += 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    @property
+    def exhausted(self):
+        return self.budget is not None and self.calls >= self.budget
+
+
+def get_reddit():
+    # imported lazily so the scraper can run against a fake client offline
+    from config import reddit  # Assumes you've stored credentials in config.py
+    return reddit
+
 
 def is_relevant(post):
     text = f"{post.title} {getattr(post, 'selftext', '')}".lower()
-    return any(keyword in text for keyword in KEYWORDS)
+    return KEYWORD_MATCHER.search(text)
 
-def scrape_subreddits():
-    all_data = []
+
+def iter_new(subreddit, limit=LIMIT_PER_SUB, limiter=None):
+    """Iterate subreddit.new(), taking a limiter token before each page is pulled."""
+    listing = iter(subreddit.new(limit=limit))
+    count = 0
+    while limit is None or count < limit:
+        if count % PAGE_SIZE == 0 and limiter is not None and not limiter.acquire():
+            return
+        try:
+            post = next(listing)
+        except StopIteration:
+            return
+        count += 1
+        yield post
+
+
+def load_checkpoints(path=CHECKPOINT_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoints(checkpoints, path=CHECKPOINT_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoints, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def fetch_subreddit(reddit, subreddit_name, after_timestamp, limiter=None, checkpoint=None):
+    """
+    Fetch relevant posts from one subreddit.
+    Listings come newest first, so paging stops at the first post that is
+    older than DAYS_LIMIT or already covered by `checkpoint`.
+    Returns the posts and the new checkpoint (newest post seen).
+    """
+    subreddit = reddit.subreddit(subreddit_name)
+    print(f"🔍 Scraping: r/{subreddit_name}")
+    limit = MAX_INCREMENTAL_POSTS if checkpoint else LIMIT_PER_SUB
+    posts = []
+    newest = checkpoint
+    for post in iter_new(subreddit, limit, limiter):
+        if checkpoint and (post.id == checkpoint["id"] or post.created_utc < checkpoint["created_utc"]):
+            break
+        if datetime.utcfromtimestamp(post.created_utc) < after_timestamp:
+            break
+        if newest is None or post.created_utc >= newest["created_utc"]:
+            newest = {"id": post.id, "created_utc": post.created_utc}
+        if not is_relevant(post):
+            continue
+        posts.append({
+            "id": post.id,
+            "subreddit": subreddit_name,
+            "title": post.title,
+            "text": getattr(post, "selftext", ""),
+            "created_utc": post.created_utc,
+            "url": post.url,
+            "score": post.score,
+            "num_comments": post.num_comments
+        })
+    if limiter is not None and limiter.exhausted:
+        # paging may have been cut short; keep the old mark so the gap is re-fetched
+        newest = checkpoint
+    return posts, newest
+
+
+def fetch_all_subreddits(reddit=None, subreddits=SUBREDDITS, workers=1, limiter=None, checkpoints=None):
+    """
+    Fetch every subreddit, either one after another (workers=1) or through a
+    thread pool. Results keep the order of `subreddits` either way.
+    Returns the posts and the updated per-subreddit checkpoints.
+    """
+    reddit = reddit or get_reddit()
+    limiter = limiter or RateLimiter()
+    checkpoints = dict(checkpoints or {})
     after_timestamp = datetime.utcnow() - timedelta(days=DAYS_LIMIT)
 
-    for subreddit_name in SUBREDDITS:
-        subreddit = reddit.subreddit(subreddit_name)
-        print(f"🔍 Scraping: r/{subreddit_name}")
+    def fetch(subreddit_name):
+        checkpoint = checkpoints.get(subreddit_name)
         try:
-            for post in subreddit.new(limit=LIMIT_PER_SUB):
-                if datetime.utcfromtimestamp(post.created_utc) < after_timestamp:
-                    continue
-                if not is_relevant(post):
-                    continue
-                data = {
-                    "subreddit": subreddit_name,
-                    "title": post.title,
-                    "text": getattr(post, "selftext", ""),
-                    "created_utc": post.created_utc,
-                    "url": post.url,
-                    "score": post.score,
-                    "num_comments": post.num_comments
-                }
-                all_data.append(data)
+            return fetch_subreddit(reddit, subreddit_name, after_timestamp, limiter, checkpoint)
         except Exception as e:
             print(f"⚠️ Failed on r/{subreddit_name}: {e}")
+            return [], checkpoint
+
+    if workers <= 1:
+        results = [fetch(name) for name in subreddits]
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(subreddits))) as pool:
+            results = list(pool.map(fetch, subreddits))
+
+    all_data = []
+    for subreddit_name, (posts, newest) in zip(subreddits, results):
+        all_data.extend(posts)
+        if newest is not None:
+            checkpoints[subreddit_name] = newest
+    return all_data, checkpoints
+
+
+def scrape_subreddits(workers=1, reddit=None, limiter=None, full_refresh=False):
+    start = time.perf_counter()
+    with measure("scrape", workers=workers) as record:
+        checkpoints = {} if full_refresh else load_checkpoints()
+        new_data, checkpoints = fetch_all_subreddits(reddit, workers=workers, limiter=limiter, checkpoints=checkpoints)
+
+        # Append to the store (skipping posts already there), then move the checkpoints forward
+        written = raw_store.append_posts(new_data)
+        save_checkpoints(checkpoints)
+        record.update(rows=len(new_data), appended=written, api_calls=limiter.calls if limiter else None)
+    print(f"\nFinished in {time.perf_counter() - start:.1f}s. {len(new_data)} relevant posts fetched, "
+          f"{written} new appended to {raw_store.RAW_STORE_PATH}")
+    return new_data
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scrape developer subreddits for problem posts.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help=f"number of subreddits fetched concurrently (e.g. {MAX_WORKERS})")
+    parser.add_argument("--rpm", type=int, default=REQUESTS_PER_MINUTE,
+                        help="API requests per minute shared by all workers")
+    parser.add_argument("--budget", type=int, default=None,
+                        help="maximum number of API requests for this run")
+    parser.add_argument("--full", action="store_true",
+                        help="ignore checkpoints and re-fetch the last LIMIT_PER_SUB posts per subreddit")
+    return parser.parse_args()
 
-    # Save data
-    os.makedirs("data", exist_ok=True)
-    with open("data/raw_data.json", "w") as f:
-        json.dump(all_data, f, indent=2)
-    print(f"\nFinished. Saved {len(all_data)} relevant posts to data/raw_data.json")
 
 if __name__ == "__main__":
-    scrape_subreddits()
+    args = parse_args()
+    scrape_subreddits(workers=args.workers, limiter=RateLimiter(rate=args.rpm, budget=args.budget),
+                      full_refresh=args.full)
@@ -0,0 +1,82 @@
+# result_cache.py
+
+import hashlib
+import os
+import sqlite3
+
+CACHE_PATH = "data/clean_cache.sqlite"
+
+# sqlite caps the number of bound parameters per statement
+BATCH_SIZE = 500
+
+
+def text_key(text):
+    """Content hash used as the cache key for a post's combined text."""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    On-disk cache of clean_text, sentiment polarity and problem label per post
+    and sentiment `backend`. Rows are tagged with the cleaner/labeler
+    `version`; rows from any other version are never returned, and
+    purge_stale() deletes them. Rows of other backends are kept, so switching
+    backends back and forth doesn't throw results away.
+    Safe to open from several worker processes at once (WAL mode).
+    """
+
+    def __init__(self, path=CACHE_PATH, version="", backend=""):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.version = version
+        self.backend = backend
+        self.conn = sqlite3.connect(path, timeout=60)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(results)")]
+        if columns and "backend" not in columns:
+            # written before results were kept per backend; it's only a cache
+            self.conn.execute("DROP TABLE results")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT, backend TEXT, version TEXT, clean_text TEXT, polarity REAL, problem_signal INTEGER, "
+            "PRIMARY KEY (key, backend))"
+        )
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def purge_stale(self):
+        deleted = self.conn.execute("DELETE FROM results WHERE version != ?", (self.version,)).rowcount
+        self.conn.commit()
+        return deleted
+
+    def get_many(self, keys):
+        """Return {key: (clean_text, polarity, problem_signal)} for cached keys."""
+        keys = list(keys)
+        found = {}
+        for start in range(0, len(keys), BATCH_SIZE):
+            batch = keys[start:start + BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            rows = self.conn.execute(
+                f"SELECT key, clean_text, polarity, problem_signal FROM results "
+                f"WHERE version = ? AND backend = ? AND key IN ({placeholders})",
+                [self.version, self.backend, *batch],
+            )
+            for key, clean_text, polarity, problem_signal in rows:
+                found[key] = (clean_text, polarity, bool(problem_signal))
+        return found
+
+    def put_many(self, rows):
+        """Store (key, clean_text, polarity, problem_signal) rows for the current version and backend."""
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+            [(key, self.backend, self.version, clean_text, polarity, int(problem_signal))
+             for key, clean_text, polarity, problem_signal in rows],
+        )
+        self.conn.commit()
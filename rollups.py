@@ -0,0 +1,184 @@
+# rollups.py
+#
+# Pre-aggregated post counts for the trend charts. One small long-format table
+# (CSV plus typed Parquet copy, see tables.py) holds, for every time bucket
+# (hour/day/month), the number of posts and problem posts per topic, subreddit
+# and problem label:
+#
+#   granularity, bucket, dimension, value, posts, problem_posts
+#
+# The "total" granularity has a single bucket counting every post, including
+# posts without a timestamp. Charts read a few hundred rows from it instead of
+# re-parsing timestamps and grouping the whole post table. Updates only
+# aggregate posts that are new, gone or changed (e.g. moved to another topic),
+# subtracting what the old version of a post had added.
+
+import argparse
+import os
+
+import pandas as pd
+
+from tables import load_table, save_table
+
+ROLLUP_DIR = "data/rollups"
+ROLLUP_PATH = os.path.join(ROLLUP_DIR, "rollups.csv")
+# the posts already counted, with the columns that decided their buckets
+POSTS_PATH = os.path.join(ROLLUP_DIR, "posts.csv")
+TOPICS_PATH = os.path.join(ROLLUP_DIR, "topics.csv")  # topic id -> keywords, for labels
+SOURCE_PATH = "output/ranked_problems.csv"
+
+GRANULARITIES = {"hour": "h", "day": "D", "month": "M", "total": None}
+TOTAL_BUCKET = pd.Timestamp(0)
+DIMENSIONS = ["all", "topic_id", "subreddit", "problem_signal"]
+KEYS = ["granularity", "bucket", "dimension", "value"]
+SOURCE_COLUMNS = ["id", "created_utc", "subreddit", "problem_signal", "topic_id", "topic_keywords"]
+
+def _timestamps(created):
+    """created_utc as datetimes, whether it holds epoch seconds or is typed already (tables.py)."""
+    if pd.api.types.is_datetime64_any_dtype(created):
+        return created
+    return pd.to_datetime(pd.to_numeric(created, errors="coerce"), unit="s")
+
+def rollup_posts(df):
+    """Aggregate a frame of posts into rollup rows; posts without a timestamp only count in "total"."""
+    df = df.assign(created=_timestamps(df["created_utc"]), all="all")
+    if "problem_signal" in df.columns:
+        df["problem_posts"] = df["problem_signal"].astype(bool).astype(int)
+    else:
+        df["problem_posts"] = 0
+
+    parts = []
+    for granularity, freq in GRANULARITIES.items():
+        if freq is None:
+            bucket = pd.Series(TOTAL_BUCKET, index=df.index)
+        elif freq == "M":
+            bucket = df["created"].dt.to_period("M").dt.start_time
+        else:
+            bucket = df["created"].dt.floor(freq)
+        for dimension in DIMENSIONS:
+            if dimension not in df.columns:
+                continue
+            grouped = (df.assign(bucket=bucket)
+                       .groupby(["bucket", dimension], observed=True)["problem_posts"]
+                       .agg(posts="size", problem_posts="sum")
+                       .reset_index()
+                       .rename(columns={dimension: "value"}))
+            grouped["value"] = grouped["value"].astype(str)
+            grouped.insert(0, "dimension", dimension)
+            grouped.insert(0, "granularity", granularity)
+            parts.append(grouped)
+    if not parts:
+        return pd.DataFrame(columns=KEYS + ["posts", "problem_posts"])
+    return pd.concat(parts, ignore_index=True)[KEYS + ["posts", "problem_posts"]]
+
+def combine(*rollups, subtract=None):
+    """Sum rollup tables bucket by bucket, minus the `subtract` table; buckets left empty are dropped."""
+    frames = [r for r in rollups if r is not None and len(r)]
+    if subtract is not None and len(subtract):
+        frames.append(subtract.assign(posts=-subtract["posts"], problem_posts=-subtract["problem_posts"]))
+    if not frames:
+        return pd.DataFrame(columns=KEYS + ["posts", "problem_posts"])
+    combined = (pd.concat(frames, ignore_index=True)
+                .groupby(KEYS, as_index=False)[["posts", "problem_posts"]].sum())
+    return combined[combined["posts"] != 0].reset_index(drop=True)
+
+def read_rollups(path=ROLLUP_PATH):
+    if not os.path.exists(path):
+        return None
+    rollups = load_table(path)
+    return rollups.assign(bucket=pd.to_datetime(rollups["bucket"]), value=rollups["value"].astype(str))
+
+def _counted(df):
+    """The id of every post and the columns that decide which buckets it is counted in."""
+    columns = ["id", "created_utc"] + [dimension for dimension in DIMENSIONS if dimension in df.columns]
+    return df[columns].assign(id=df["id"].astype(str), created_utc=_timestamps(df["created_utc"]))
+
+def _seen_posts():
+    if not os.path.exists(POSTS_PATH):
+        return None
+    seen = load_table(POSTS_PATH)
+    return seen.assign(id=seen["id"].astype(str), created_utc=_timestamps(seen["created_utc"]))
+
+def _changes(current, seen):
+    """(rows to subtract, rows to add): posts that are gone or changed as counted, and new or changed posts."""
+    merged = seen[["id"]].merge(current[["id"]], on="id", how="outer", indicator=True)
+    gone = set(merged.loc[merged["_merge"] == "left_only", "id"])
+    new = set(merged.loc[merged["_merge"] == "right_only", "id"])
+
+    both = seen.merge(current, on="id", suffixes=("_seen", ""))
+    changed = pd.Series(False, index=both.index)
+    for column in current.columns.drop("id"):
+        old, now = both[f"{column}_seen"], both[column]
+        changed |= (old.astype(str) != now.astype(str)) & ~(old.isna() & now.isna())
+    changed = set(both.loc[changed, "id"])
+    return seen[seen["id"].isin(gone | changed)], current[current["id"].isin(new | changed)]
+
+def update_rollups(df, full=False):
+    """
+    Bring the stored rollups in line with `df`, the full current set of posts:
+    new posts are added, and posts that are gone or changed are subtracted as
+    they were counted (and changed ones added back as they are now). Returns
+    (rollups, number of posts added or changed).
+    """
+    if "id" not in df.columns:
+        # posts can't be told apart; count everything every time
+        rollups = rollup_posts(df)
+        save_table(rollups, ROLLUP_PATH)
+        return rollups, len(df)
+
+    df = df.drop_duplicates("id")
+    current = _counted(df)
+    seen = None if full else _seen_posts()
+    existing = read_rollups() if seen is not None else None
+    if existing is None or set(seen.columns) != set(current.columns):
+        removed, added = current.iloc[:0], current
+        existing = None
+    else:
+        removed, added = _changes(current, seen)
+
+    if existing is None or len(removed) or len(added):
+        rollups = combine(existing, rollup_posts(added), subtract=rollup_posts(removed))
+        save_table(rollups, ROLLUP_PATH)
+        save_table(current, POSTS_PATH)
+    else:
+        rollups = existing
+    if "topic_id" in df.columns and "topic_keywords" in df.columns:
+        (df[["topic_id", "topic_keywords"]].drop_duplicates("topic_id")
+         .sort_values("topic_id").to_csv(TOPICS_PATH, index=False))
+    return rollups, len(added)
+
+def select_rollups(rollups, granularity="month", dimension="all"):
+    """Rows of a rollup table for one granularity and dimension, oldest bucket first."""
+    selected = rollups[(rollups["granularity"] == granularity) & (rollups["dimension"] == dimension)]
+    return selected.drop(columns=["granularity", "dimension"]).sort_values(["bucket", "value"]).reset_index(drop=True)
+
+def load_rollups(granularity="month", dimension="all", path=ROLLUP_PATH):
+    """Stored rows for one granularity and dimension; None if not built yet."""
+    rollups = read_rollups(path)
+    if rollups is None:
+        return None
+    return select_rollups(rollups, granularity, dimension)
+
+def topic_labels(path=TOPICS_PATH):
+    """topic id (as stored in the rollups) -> topic keywords."""
+    if not os.path.exists(path):
+        return {}
+    topics = pd.read_csv(path)
+    return dict(zip(topics["topic_id"].astype(str), topics["topic_keywords"]))
+
+def main(full=False):
+    if not os.path.exists(SOURCE_PATH):
+        print(f" {SOURCE_PATH} not found. Run topic_modeling.py first.")
+        return
+    df = load_table(SOURCE_PATH, SOURCE_COLUMNS)
+    rollups, added = update_rollups(df, full=full)
+    print(f"Rolled up {added} posts into {len(rollups)} buckets, saved to {ROLLUP_PATH}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Update hourly/daily/monthly post count rollups.")
+    parser.add_argument("--full", action="store_true", help="recount every post instead of only new ones")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(full=args.full)
@@ -0,0 +1,190 @@
+# scoring_service.py
+
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import joblib
+import numpy as np
+
+from ml_models.artifacts import load_artifact
+from text_cleaner import clean_texts
+
+MODEL_PATH = "ml_models/problem_classifier.pkl"
+VECTORIZER_PATH = "ml_models/tfidf_vectorizer.pkl"
+ARTIFACT_NAME = "logistic_regression"
+BATCH_SIZE = 256
+LATENCY_WINDOW = 10000  # micro-batches kept for the p50/p99 stats
+
+def is_post(item):
+    """Posts are dicts with title/text or plain strings."""
+    return isinstance(item, (dict, str))
+
+def combined_text(post):
+    """Same combined text text_cleaner builds: title + body. Plain strings are used as-is."""
+    if isinstance(post, str):
+        return post
+    if not isinstance(post, dict):
+        raise ValueError(f"a post must be an object or a string, not {type(post).__name__}")
+    return f"{post.get('title') or ''} {post.get('text') or ''}"
+
+class ProblemScorer:
+    """
+    Loads the trained classifier once and scores raw posts in micro-batches:
+    clean_text -> TF-IDF -> predict_proba. Keeps micro-batch latency stats.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, vectorizer_path=VECTORIZER_PATH, batch_size=BATCH_SIZE,
+                 artifact=ARTIFACT_NAME):
+        try:
+            # lean artifact when one has been exported, else the joblib pickles
+            self.model, self.vectorizer, _ = load_artifact(artifact)
+        except FileNotFoundError:
+            self.model = joblib.load(model_path)
+            self.vectorizer = joblib.load(vectorizer_path)
+        self.batch_size = batch_size
+        self.positive = list(self.model.classes_).index(True)
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        self.posts_scored = 0
+
+    def score(self, posts):
+        """Problem probability for each post (dicts with title/text, or strings)."""
+        texts = [combined_text(post) for post in posts]
+        probabilities = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            began = time.perf_counter()
+            X = self.vectorizer.transform(clean_texts(batch))
+            probabilities.extend(self.model.predict_proba(X)[:, self.positive].tolist())
+            elapsed = time.perf_counter() - began
+            with self._lock:
+                self._latencies.append(elapsed)
+                self.posts_scored += len(batch)
+        return probabilities
+
+    def latency_stats(self):
+        """p50/p99 latency (ms) of the recent micro-batches."""
+        with self._lock:
+            latencies = np.array(self._latencies)
+            scored = self.posts_scored
+        if not len(latencies):
+            return {"posts_scored": scored, "p50_ms": None, "p99_ms": None}
+        p50, p99 = np.percentile(latencies * 1000, [50, 99])
+        return {"posts_scored": scored, "p50_ms": round(float(p50), 4), "p99_ms": round(float(p99), 4)}
+
+def make_handler(scorer):
+    class ScoringHandler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/metrics":
+                self._send(200, scorer.latency_stats())
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/score":
+                self._send(404, {"error": "not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                posts = payload["posts"] if isinstance(payload, dict) else payload
+                if not isinstance(posts, list):
+                    raise ValueError("posts must be a list")
+                invalid = [i for i, post in enumerate(posts) if not is_post(post)]
+                if invalid:
+                    raise ValueError(f"posts must be objects or strings (item {invalid[0]} is not)")
+            except (ValueError, KeyError) as e:
+                self._send(400, {"error": f"expected {{\"posts\": [...]}}: {e}"})
+                return
+            probabilities = scorer.score(posts)
+            self._send(200, {"probabilities": probabilities, "latency": scorer.latency_stats()})
+
+        def log_message(self, format, *args):
+            pass
+
+    return ScoringHandler
+
+def serve(scorer, host="127.0.0.1", port=8765):
+    server = ThreadingHTTPServer((host, port), make_handler(scorer))
+    print(f"Scoring posts on http://{host}:{port}/score (metrics at /metrics)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+def score_file(scorer, input_file, output_file):
+    """Score a JSONL stream of posts, writing each post back with its problem_probability."""
+    batch = []
+
+    def flush():
+        for post, probability in zip(batch, scorer.score(batch)):
+            record = post if isinstance(post, dict) else {"text": post}
+            output_file.write(json.dumps({**record, "problem_probability": probability}) + "\n")
+        batch.clear()
+
+    for line_no, line in enumerate(input_file, 1):
+        if not line.strip():
+            continue
+        try:
+            post = json.loads(line)
+        except json.JSONDecodeError:
+            post = None
+        if not is_post(post):
+            print(f"⚠️ Skipping line {line_no}: not a JSON post object or string", file=sys.stderr)
+            continue
+        batch.append(post)
+        if len(batch) >= scorer.batch_size:
+            flush()
+    if batch:
+        flush()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Score raw posts with the trained problem classifier.")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    score = commands.add_parser("score", help="score a JSONL file of posts")
+    score.add_argument("input", nargs="?", default="-", help="JSONL posts (default: stdin)")
+    score.add_argument("-o", "--output", default="-", help="JSONL output (default: stdout)")
+
+    http = commands.add_parser("serve", help="run a local HTTP scoring endpoint")
+    http.add_argument("--host", default="127.0.0.1")
+    http.add_argument("--port", type=int, default=8765)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    scorer = ProblemScorer(batch_size=args.batch_size)
+
+    if args.command == "serve":
+        serve(scorer, args.host, args.port)
+        return
+
+    input_file = sys.stdin if args.input == "-" else open(args.input)
+    output_file = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        score_file(scorer, input_file, output_file)
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+    print(json.dumps(scorer.latency_stats()), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-import pandas as pd
+from tables import load_table
 
-df = pd.read_csv("data/cleaned_labeled_posts.csv")
+df = load_table("data/cleaned_labeled_posts.csv", ["problem_signal"])
 print(df["problem_signal"].value_counts())
@@ -0,0 +1,161 @@
+# search_index.py
+
+import argparse
+import os
+import re
+import sqlite3
+
+import pandas as pd
+
+from tables import load_table
+
+SEARCH_PATH = "data/search_index.sqlite"
+SOURCE_PATH = "output/ranked_problems.csv"
+SEARCH_COLUMNS = ["title", "text", "clean_text"]
+# bm25 weights for title, text, clean_text: a hit in the title counts most
+COLUMN_WEIGHTS = (5.0, 1.0, 1.0)
+RESULT_LIMIT = 500
+
+TERM_PATTERN = re.compile(r"\w+")
+
+
+def fts_query(query):
+    """Free text -> FTS5 query: every word must match, special characters are ignored."""
+    return " ".join(f'"{term}"' for term in TERM_PATTERN.findall(query.lower()))
+
+
+class SearchIndex:
+    """
+    SQLite FTS5 full-text index over title, text and clean_text of the ranked
+    posts, with BM25 ranking. `docs` holds the indexed text per post id and
+    backs the external-content `docs_fts` table; update() only touches posts
+    that are new, vanished or changed since the last sync.
+    """
+
+    def __init__(self, path=SEARCH_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=60)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS docs ("
+            "rowid INTEGER PRIMARY KEY, id TEXT UNIQUE, topic_id INTEGER, title TEXT, text TEXT, clean_text TEXT)"
+        )
+        self.conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5("
+            "title, text, clean_text, content='docs', content_rowid='rowid', tokenize='porter unicode61')"
+        )
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def update(self, df):
+        """
+        Sync the index with a frame of posts (id, topic_id, title, text, clean_text);
+        returns (added, changed, removed). Posts whose text changed are reindexed,
+        posts whose topic changed only get their topic id rewritten.
+        """
+        df = df.drop_duplicates("id")
+        ids = df["id"].astype(str).tolist()
+        topic_ids = _ints(df["topic_id"]) if "topic_id" in df.columns else [None] * len(df)
+        rows = list(zip(ids, topic_ids, *(_texts(df, column) for column in SEARCH_COLUMNS)))
+        indexed = {row[0]: row[1:] for row in self.conn.execute(
+            "SELECT id, rowid, topic_id, title, text, clean_text FROM docs")}
+
+        current = set(ids)
+        removed = [rowid for post_id, (rowid, *_) in indexed.items() if post_id not in current]
+        new, rewritten, retopic = [], [], []
+        for row in rows:
+            old = indexed.get(row[0])
+            if old is None:
+                new.append(row)
+            elif tuple(old[2:]) != row[2:]:
+                rewritten.append(old[0])
+                new.append(row)
+            elif old[1] != row[1]:
+                retopic.append((row[1], row[0]))
+
+        with self.conn:
+            # external-content tables need the old values to remove a row from the index
+            self.conn.executemany(
+                "INSERT INTO docs_fts (docs_fts, rowid, title, text, clean_text) "
+                "SELECT 'delete', rowid, title, text, clean_text FROM docs WHERE rowid = ?",
+                [(rowid,) for rowid in removed + rewritten],
+            )
+            self.conn.executemany("DELETE FROM docs WHERE rowid = ?", [(rowid,) for rowid in removed + rewritten])
+            last_rowid = self.conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM docs").fetchone()[0]
+
+            self.conn.executemany(
+                "INSERT INTO docs (id, topic_id, title, text, clean_text) VALUES (?, ?, ?, ?, ?)", new
+            )
+            self.conn.execute(
+                "INSERT INTO docs_fts (rowid, title, text, clean_text) "
+                "SELECT rowid, title, text, clean_text FROM docs WHERE rowid > ?",
+                (last_rowid,),
+            )
+            self.conn.executemany("UPDATE docs SET topic_id = ? WHERE id = ?", retopic)
+        return len(new) - len(rewritten), len(rewritten) + len(retopic), len(removed)
+
+    def search(self, query, limit=RESULT_LIMIT, topic_ids=None):
+        """Best-matching posts for a free-text query as a DataFrame (id, topic_id, title, rank)."""
+        match = fts_query(query)
+        if not match:
+            return pd.DataFrame(columns=["id", "topic_id", "title", "rank"])
+        sql = (
+            "SELECT d.id, d.topic_id, d.title, bm25(docs_fts, ?, ?, ?) AS rank "
+            "FROM docs_fts JOIN docs d ON d.rowid = docs_fts.rowid WHERE docs_fts MATCH ?"
+        )
+        params = [*COLUMN_WEIGHTS, match]
+        if topic_ids:
+            sql += f" AND d.topic_id IN ({','.join('?' * len(topic_ids))})"
+            params.extend(int(t) for t in topic_ids)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+        return pd.read_sql_query(sql, self.conn, params=params)
+
+
+def _texts(df, column):
+    if column not in df.columns:
+        return [""] * len(df)
+    return df[column].fillna("").astype(str).tolist()
+
+
+def _ints(values):
+    return [None if pd.isna(v) else int(v) for v in values]
+
+
+def search_posts(query, limit=RESULT_LIMIT, topic_ids=None, path=SEARCH_PATH):
+    """One-off search; None when the index has not been built yet."""
+    if not os.path.exists(path):
+        return None
+    with SearchIndex(path) as index:
+        return index.search(query, limit, topic_ids)
+
+
+def main(query=None, rebuild=False):
+    if rebuild and os.path.exists(SEARCH_PATH):
+        os.remove(SEARCH_PATH)
+    with SearchIndex() as index:
+        if query:
+            print(index.search(query, limit=20).to_string(index=False))
+            return
+        df = load_table(SOURCE_PATH, ["id", "topic_id", *SEARCH_COLUMNS])
+        added, changed, removed = index.update(df)
+        print(f"Search index: {added} posts added, {changed} changed, {removed} removed, {len(index)} indexed in {SEARCH_PATH}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query the full-text search index over ranked posts.")
+    parser.add_argument("query", nargs="?", help="search instead of updating the index")
+    parser.add_argument("--rebuild", action="store_true", help="drop the index and index every post again")
+    args = parser.parse_args()
+    main(args.query, args.rebuild)
@@ -0,0 +1,258 @@
+# sentiment.py
+#
+# Sentiment backends for labeling. Each one scores a batch of texts at once:
+#
+#   get_backend().polarity(texts)  ->  array of polarities in [-1, 1]
+#
+#   textblob  TextBlob's PatternAnalyzer, one TextBlob per post (the original labels)
+#   lexicon   the same lexicon and rules, applied to a whole batch of token arrays
+#             with NumPy lookups; no per-post objects
+#
+# The backend is picked by name, or by INNOMINE_SENTIMENT (inherited by worker
+# processes); textblob is the default. `python sentiment.py` reports how well
+# the lexicon backend agrees with TextBlob on the stored posts.
+
+import argparse
+import csv
+import json
+import os
+import re
+import time
+from functools import lru_cache
+
+import numpy as np
+
+DEFAULT_BACKEND = "textblob"
+# Copy of TextBlob's English sentiment lexicon (word senses averaged), so the lexicon backend works without it
+LEXICON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "sentiment_lexicon.tsv")
+REPORT_PATH = "output/sentiment_agreement.json"
+
+# Tokens as TextBlob's tokenizer finds them: a word runs from its first to its last
+# non-punctuation character ("real-time", "asp.net"), punctuation around it is split
+# off one mark at a time, and quotes split words ("don't" -> "don ' t", so unlike
+# "not", "n't" never negates anything, as in TextBlob)
+PUNCTUATION = ".,;:!?()[]{}`'\"@#$^&*+-|=~_"
+QUOTES = re.compile("['\"‘’“”]")
+TOKEN_PATTERN = re.compile(r"[^\s{0}](?:\S*[^\s{0}])?|[{0}]".format(re.escape(PUNCTUATION)))
+# TextBlob's emoticons (lowercased) by polarity; split-up ones (": [") are joined back as TextBlob does
+EMOTICONS = {
+    1.0: ("<3", "♥", ">:d", ":-d", ":d", "=-d", "=d", "x-d", "xd", "8-d"),
+    0.75: (">:p", ":-p", ":p", ":-b", ":b", ":c)", ":o)", ":^)"),
+    0.5: (">:)", ":-)", ":)", "=)", "=]", ":]", ":}", ":>", ":3", "8)", "8-)"),
+    0.25: (">;]", ";-)", ";)", ";-]", ";]", ";d", ";^)", "*-)", "*)"),
+    0.05: (">:o", ":-o", ":o", "o_o", "o.o", "°o°"),
+    -0.25: (">:/", ":-/", ":/", ":\\", ">:\\", ":-.", ":-s", ":s", ">.>"),
+    -0.75: (">:[", ":-(", ":(", "=(", ":-[", ":[", ":{", ":-<", ":c", ":-c", "=/"),
+    -1.0: (":'(", ":'''(", ";'("),
+}
+EMOTICON_PATTERN = re.compile(r"({})($|\s)".format("|".join(
+    r" ?".join(re.escape(char) for char in emoticon) for emoticons in EMOTICONS.values() for emoticon in emoticons)))
+NEGATIONS = ("no", "not", "never")
+
+class TextBlobSentiment:
+    name = "textblob"
+
+    def polarity(self, texts):
+        from textblob import TextBlob
+        return np.array([TextBlob(text.lower()).sentiment.polarity for text in texts], dtype=np.float64)
+
+def _textblob_lexicon():
+    """(word, polarity, intensity, is_modifier) rows from TextBlob's lexicon, senses averaged as TextBlob does."""
+    from textblob.en import sentiment
+    sentiment.load()
+    rows = []
+    for word, senses in sorted(dict.items(sentiment)):
+        polarity, _, intensity = senses[None] if None in senses else np.mean(list(senses.values()), axis=0)
+        rows.append((word, round(float(polarity), 6), round(float(intensity), 6), "RB" in senses))
+    return rows
+
+def write_lexicon(path=LEXICON_PATH):
+    rows = _textblob_lexicon()
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f, delimiter="\t", lineterminator="\n")
+        writer.writerow(["word", "polarity", "intensity", "modifier"])
+        writer.writerows((word, polarity, intensity, int(modifier)) for word, polarity, intensity, modifier in rows)
+    return len(rows)
+
+@lru_cache(maxsize=None)
+def load_lexicon(path=LEXICON_PATH):
+    if not os.path.exists(path):
+        return _textblob_lexicon()
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f, delimiter="\t")
+        return [(row["word"], float(row["polarity"]), float(row["intensity"]), row["modifier"] == "1") for row in reader]
+
+def _previous(post, keep):
+    """Index of the closest earlier token of the same post with `keep` set, or -1."""
+    index = np.maximum.accumulate(np.where(keep, np.arange(len(post)), -1)) if len(post) else np.empty(0, dtype=np.int64)
+    previous = np.r_[-1, index[:-1]].astype(np.int64)
+    same = previous >= 0
+    same[same] = post[previous[same]] == post[same]
+    return np.where(same, previous, -1)
+
+class LexiconSentiment:
+    """
+    TextBlob's scoring rules, vectorized over every token of a batch: a known
+    word's polarity is scaled by a preceding modifier ("very good"), flipped
+    and halved after a negation ("not good", "not very good", "definitely not
+    good"), boosted by each "!" that follows it, and a post's polarity is the
+    mean over its assessed words. Sarcasm marks "(!)" and some longer chains
+    of modifiers and filler words are not handled, so scores differ slightly
+    from TextBlob's on a share of posts (see agreement_report).
+    """
+
+    name = "lexicon"
+
+    def __init__(self, lexicon=None):
+        rows = lexicon or load_lexicon()
+        # emoticons are scored like lexicon words
+        rows = list(rows) + [(emoticon, polarity, 1.0, False)
+                             for polarity, emoticons in EMOTICONS.items() for emoticon in emoticons]
+        # id 0 is every unknown token; negations and "!" get ids of their own
+        words = [word for word, *_ in rows]
+        extra = [token for token in NEGATIONS + ("!",) if token not in set(words)]
+        self.vocabulary = {token: i for i, token in enumerate(words + extra, 1)}
+        size = len(self.vocabulary) + 1
+        self.known = np.zeros(size, dtype=bool)
+        self.scores = np.zeros(size)
+        self.intensity = np.ones(size)
+        self.modifier = np.zeros(size, dtype=bool)
+        for i, (_, polarity, intensity, modifier) in enumerate(rows, 1):
+            self.known[i], self.scores[i], self.intensity[i], self.modifier[i] = True, polarity, intensity, modifier
+        self.negation = np.zeros(size, dtype=bool)
+        self.negation[[self.vocabulary[token] for token in NEGATIONS]] = True
+        self.exclamation = self.vocabulary["!"]
+
+    @staticmethod
+    def tokenize(text):
+        text = " ".join(TOKEN_PATTERN.findall(QUOTES.sub(" ' ", text.lower())))
+        if any(char in text for char in ":;=<>*8°"):
+            text = EMOTICON_PATTERN.sub(lambda m: m.group(1).replace(" ", "") + m.group(2), text)
+        return text.split()
+
+    def token_ids(self, texts):
+        """
+        Flat arrays of token ids and lengths for the batch, and the number of
+        tokens per text. Unknown one-letter tokens ("i", "a") are left out:
+        TextBlob carries negations and modifiers across them.
+        """
+        vocabulary = self.vocabulary
+        tokens = [[token for token in self.tokenize(text) if len(token) > 1 or token in vocabulary]
+                  if isinstance(text, str) else [] for text in texts]
+        counts = np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens))
+        total = int(counts.sum())
+        ids = np.fromiter((vocabulary.get(token, 0) for post in tokens for token in post), dtype=np.int64, count=total)
+        lengths = np.fromiter((len(token) for post in tokens for token in post), dtype=np.int64, count=total)
+        return ids, lengths, counts
+
+    def polarity(self, texts):
+        ids, lengths, counts = self.token_ids(texts)
+        post = np.repeat(np.arange(len(counts)), counts)
+        known = self.known[ids]
+        # position -1 (no such token) looks up a trailing unknown token
+        token = np.r_[ids, 0]
+
+        prev = _previous(post, np.ones(len(ids), dtype=bool))
+        prev2 = np.r_[prev, -1][prev]
+        # modifiers carry across short unknown words ("really is a good")
+        prev_modifier = _previous(post, known | (lengths > 2))
+        before_modifier = np.r_[prev, -1][prev_modifier]
+
+        after_modifier = self.modifier[token[prev_modifier]]
+        negated_modifier = after_modifier & self.negation[token[before_modifier]]  # "not very good"
+        negation_first = ~after_modifier & self.negation[token[prev]] & self.modifier[token[prev2]]  # "definitely not good"
+        negated = self.negation[token[prev]] | negated_modifier
+        source = np.where(after_modifier, prev_modifier, np.where(negation_first, prev2, -1))
+        modified = known & (source >= 0)
+
+        intensity = np.where(modified, self.intensity[token[source]], 1.0)
+        intensity = np.where(negated_modifier, 1.0 / intensity, intensity)
+        scores = np.clip(self.scores[ids] * intensity, -1.0, 1.0)
+
+        # a modifier merges into the word it modifies instead of being assessed on its own
+        assessed = known.copy()
+        assessed[source[modified]] = False
+
+        # each "!" boosts the closest assessed word before it
+        last = _previous(post, assessed)
+        targets = last[(ids == self.exclamation) & (last >= 0)]
+        boosts = np.bincount(targets, minlength=len(ids))
+        scores = np.clip(scores * 1.25 ** boosts, -1.0, 1.0)
+        scores = np.where(known & negated, scores * -0.5, scores)
+
+        totals = np.bincount(post[assessed], weights=scores[assessed], minlength=len(counts))
+        assessments = np.bincount(post[assessed], minlength=len(counts))
+        return totals / np.maximum(assessments, 1)
+
+BACKENDS = {backend.name: backend for backend in (TextBlobSentiment, LexiconSentiment)}
+
+@lru_cache(maxsize=None)
+def _backend(name):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown sentiment backend {name!r}; choose one of {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
+
+def backend_name():
+    return os.environ.get("INNOMINE_SENTIMENT") or DEFAULT_BACKEND
+
+def get_backend(name=None):
+    """The named backend (default: INNOMINE_SENTIMENT, else textblob), created once per process."""
+    return _backend(name or backend_name())
+
+def agreement_report(texts, threshold=0.1):
+    """
+    Compare the lexicon backend with TextBlob on the same texts: polarity
+    correlation and error, and how often the labeling rule
+    (polarity < threshold) comes out the same.
+    """
+    timings, scores = {}, {}
+    for name in ("textblob", "lexicon"):
+        backend = get_backend(name)
+        backend.polarity(texts[:1])  # load the lexicon outside the timing
+        start = time.perf_counter()
+        scores[name] = backend.polarity(texts)
+        timings[name] = time.perf_counter() - start
+    reference, fast = scores["textblob"], scores["lexicon"]
+    negative_ref, negative_fast = reference < threshold, fast < threshold
+    return {
+        "posts": len(texts),
+        "pearson": round(float(np.corrcoef(reference, fast)[0, 1]), 4) if len(texts) > 1 else None,
+        "mean_abs_diff": round(float(np.abs(reference - fast).mean()), 4),
+        "exact_share": round(float(np.isclose(reference, fast, atol=1e-6).mean()), 4),
+        "label_agreement": round(float((negative_ref == negative_fast).mean()), 4),
+        "only_textblob_below_threshold": int((negative_ref & ~negative_fast).sum()),
+        "only_lexicon_below_threshold": int((~negative_ref & negative_fast).sum()),
+        "textblob_posts_per_s": round(len(texts) / timings["textblob"], 1),
+        "lexicon_posts_per_s": round(len(texts) / timings["lexicon"], 1),
+    }
+
+def main(limit=None, write=False):
+    import raw_store
+
+    if write:
+        print(f"✅ {write_lexicon()} words written to {LEXICON_PATH}")
+        return
+
+    texts = []
+    for post in raw_store.iter_posts():
+        texts.append(f"{post.get('title') or ''} {post.get('text') or ''}")
+        if limit and len(texts) >= limit:
+            break
+    if not texts:
+        print("raw_posts.jsonl not found or empty. Please scrape posts first.")
+        return
+
+    report = agreement_report(texts)
+    for key, value in report.items():
+        print(f"{key:<32} {value}")
+    os.makedirs(os.path.dirname(REPORT_PATH), exist_ok=True)
+    with open(REPORT_PATH, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report saved to {REPORT_PATH}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the lexicon sentiment backend with TextBlob on the stored posts.")
+    parser.add_argument("--limit", type=int, default=None, help="only the first N posts")
+    parser.add_argument("--write-lexicon", action="store_true", help=f"regenerate {LEXICON_PATH} from TextBlob")
+    args = parser.parse_args()
+    main(limit=args.limit, write=args.write_lexicon)
@@ -1,23 +1,86 @@
 # streamlit_app.py
 
+import os
+
 import streamlit as st
 import pandas as pd
+import numpy as np
 from config.topic_labels import TOPIC_LABELS
+from instrumentation import measure
+from search_index import search_posts
+from tables import load_table
+
+DATA_PATH = "output/ranked_problems.csv"
+# only what the page shows, filters or sorts on; the long text columns used for modeling are skipped
+COLUMNS = ["id", "topic_id", "topic_keywords", "title", "text", "url", "score", "num_comments", "created_utc"]
+PAGE_SIZE = 20
+SORT_OPTIONS = {
+    "Topic ranking": None,
+    "Score": "score",
+    "Comments": "num_comments",
+    "Newest": "created_utc",
+}
 
 # first Streamlit command
 st.set_page_config(page_title="Innomine – Developer Pain Points", layout="wide")
 
-@st.cache_data
-def load_data():
+def build_index(df):
+    """
+    Row positions per topic and each row's rank under every sort option, so
+    filtering is a dict lookup and sorting only touches the selected rows.
+    """
+    topic_rows = {int(t): rows for t, rows in df.groupby("topic_id").indices.items()}
+    ranks = {}
+    for label, column in SORT_OPTIONS.items():
+        if column in df.columns:
+            values = pd.to_numeric(df[column], errors="coerce")
+            ranks[label] = values.rank(method="first", ascending=False, na_option="bottom").to_numpy()
+    # largest topics first
+    topic_sizes = sorted(topic_rows, key=lambda t: -len(topic_rows[t]))
+    # post id -> row position, to map search hits back onto the frame
+    positions = None
+    if "id" in df.columns:
+        ids = df["id"].astype(str)
+        first = ~ids.duplicated()
+        positions = pd.Series(np.flatnonzero(first), index=ids[first])
+    return {"topics": topic_rows, "ranks": ranks, "by_size": topic_sizes, "positions": positions}
+
+# Shared (not copied) across reruns; the frame is never modified. Keyed by the file's mtime.
+@st.cache_resource
+def load_data(mtime):
     try:
-        df = pd.read_csv("output/ranked_problems.csv")
-        assert "topic_id" in df.columns and "title" in df.columns
-        return df
+        with measure("app.load_data") as record:
+            df = load_table(DATA_PATH, COLUMNS)
+            assert "topic_id" in df.columns and "title" in df.columns
+            index = build_index(df)
+            record["rows"] = len(df)
+        return df, index
     except Exception as e:
         st.error(f" Failed to load data: {e}")
-        return pd.DataFrame()
+        return pd.DataFrame(), None
+
+def search_rows(index, query, topic_ids):
+    """Row positions of the best search hits (best first); None if there is no search index."""
+    hits = search_posts(query, topic_ids=topic_ids)
+    if hits is None or index["positions"] is None:
+        return None
+    return index["positions"].reindex(hits["id"]).dropna().astype(np.intp).to_numpy()
 
-df = load_data()
+def select_rows(index, n_rows, topic_ids, sort_label, rows=None):
+    """
+    Row positions for the chosen topics (all rows if none), in the chosen order.
+    Given search hits as `rows`, they keep their relevance order under "Topic ranking".
+    """
+    if rows is None:
+        if topic_ids:
+            rows = np.sort(np.concatenate([index["topics"].get(t, np.array([], dtype=np.intp)) for t in topic_ids]))
+        else:
+            rows = np.arange(n_rows)
+    if sort_label in index["ranks"]:
+        rows = rows[np.argsort(index["ranks"][sort_label][rows], kind="stable")]
+    return rows
+
+df, index = load_data(os.path.getmtime(DATA_PATH) if os.path.exists(DATA_PATH) else None)
 
 st.title(" Innomine: Reddit-Based Developer Problem Scanner")
 st.markdown("Analyze real-world issues developers face – discover topics, trends, and opportunities for new tools or fixes.")
@@ -27,26 +90,43 @@ if df.empty:
 else:
     # Show Top 5 Trending Topics
     st.markdown("### Trending Topics")
-    top_topics = df["topic_id"].value_counts().head(5).index.tolist()
+    top_topics = index["by_size"][:5]
     selected_trending = st.selectbox("Quick jump to a trending topic:", [f"{t} – {TOPIC_LABELS.get(int(t), 'Unknown')}" for t in top_topics])
     trending_topic_id = int(selected_trending.split("–")[0].strip()) if selected_trending else None
 
     # Sidebar filters
     with st.sidebar:
         st.header("Filter")
-        selected_topics = st.multiselect("Select Topic(s):", sorted(df["topic_id"].astype(str).unique()))
+        query = st.text_input("Search posts:", placeholder="e.g. react state error")
+        selected_topics = st.multiselect("Select Topic(s):", [str(t) for t in sorted(index["topics"])])
+        sort_label = st.selectbox("Sort by:", [label for label in SORT_OPTIONS if label == "Topic ranking" or label in index["ranks"]])
 
     # Apply filters (from sidebar or trending)
     if selected_topics:
-        filtered_df = df[df["topic_id"].astype(str).isin(selected_topics)]
+        topic_ids = [int(t) for t in selected_topics]
     elif trending_topic_id is not None:
-        filtered_df = df[df["topic_id"] == trending_topic_id]
+        topic_ids = [trending_topic_id]
     else:
-        filtered_df = df
+        topic_ids = []
+
+    # a search covers all topics unless some are picked in the sidebar
+    hits = None
+    if query.strip():
+        hits = search_rows(index, query, [int(t) for t in selected_topics])
+        if hits is None:
+            st.info("Search index not built yet – run `topic_modeling.py` or `search_index.py`.")
+    rows = select_rows(index, len(df), topic_ids, sort_label, hits)
+
+    # Only one page of posts is rendered per rerun
+    n_pages = max(1, -(-len(rows) // PAGE_SIZE))
+    page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, step=1,
+                           key=f"page-{topic_ids}-{sort_label}-{query}")
+    start = (page - 1) * PAGE_SIZE
+    page_df = df.iloc[rows[start:start + PAGE_SIZE]]
 
     # Display results
-    st.subheader(f"🧾 Showing {len(filtered_df)} posts")
-    for _, row in filtered_df.iterrows():
+    st.subheader(f"🧾 Showing {start + 1 if len(rows) else 0}–{start + len(page_df)} of {len(rows)} posts")
+    for _, row in page_df.iterrows():
         with st.expander(f"Topic {row['topic_id']} – {row['topic_keywords']}"):
             st.markdown(f"**Title**: {row['title']}")
             st.markdown(f"**Post**: {row['text']}")
@@ -0,0 +1,140 @@
+# tables.py
+#
+# Typed, columnar copies of the pipeline's post tables. The CSVs stay the
+# canonical files (feature and model versions are hashes of them); next to each
+# one a Parquet file with explicit dtypes is written, and readers load only
+# the columns they use from it:
+#
+#   data/cleaned_labeled_posts.csv  ->  data/cleaned_labeled_posts.parquet
+#   data/deduped_posts.csv          ->  data/deduped_posts.parquet
+#   output/ranked_problems.csv      ->  output/ranked_problems.parquet
+#
+# Without pyarrow everything falls back to reading the CSV.
+
+import importlib.util
+import os
+
+import pandas as pd
+
+CLEANED_PATH = "data/cleaned_labeled_posts.csv"
+# one canonical post per group of near-duplicates (dedup.py); what the models read
+DEDUPED_PATH = "data/deduped_posts.csv"
+RANKED_PATH = "output/ranked_problems.csv"
+
+CATEGORY_COLUMNS = ["subreddit", "topic"]
+DTYPES = {
+    "subreddit": "category",
+    "topic": "category",
+    "topic_id": "int64",
+    "problem_signal": "bool",
+    "duplicates": "int64",
+}
+TEXT_COLUMNS = ["id", "title", "text", "url", "combined_text", "clean_text", "topic_keywords"]
+
+def has_parquet():
+    return importlib.util.find_spec("pyarrow") is not None
+
+def parquet_path(path):
+    return os.path.splitext(path)[0] + ".parquet"
+
+def _parquet_current(path, parquet):
+    """The Parquet copy is used only if it was written after the CSV."""
+    return (has_parquet() and os.path.exists(parquet)
+            and (not os.path.exists(path) or os.path.getmtime(parquet) >= os.path.getmtime(path)))
+
+def typed(df):
+    """Apply the table dtypes: categorical subreddit/topic, int topic_id, datetime created_utc."""
+    df = df.astype({column: dtype for column, dtype in DTYPES.items() if column in df.columns})
+    if "created_utc" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["created_utc"]):
+        created = pd.to_numeric(df["created_utc"], errors="coerce")
+        df["created_utc"] = pd.to_datetime(created, unit="s").astype("datetime64[ms]")
+    return df
+
+def csv_frame(df):
+    """Inverse of typed() for the CSV copy: created_utc back to epoch seconds."""
+    if "created_utc" in df.columns and pd.api.types.is_datetime64_any_dtype(df["created_utc"]):
+        df = df.assign(created_utc=(df["created_utc"] - pd.Timestamp(0)) / pd.Timedelta(seconds=1))
+    return df
+
+def _arrow_schema(df):
+    import pyarrow as pa
+
+    # fixed types for the known columns, so every chunk written has the same schema
+    types = {"created_utc": pa.timestamp("ms"), "topic_id": pa.int64(), "problem_signal": pa.bool_(),
+             "score": pa.int64(), "num_comments": pa.int64(), "duplicates": pa.int64(),
+             **{column: pa.string() for column in TEXT_COLUMNS + CATEGORY_COLUMNS}}
+    inferred = pa.Schema.from_pandas(df, preserve_index=False)
+    return pa.schema([pa.field(name, types.get(name, inferred.field(name).type)) for name in inferred.names])
+
+class TableWriter:
+    """
+    Writes a table chunk by chunk to temporary CSV and Parquet files;
+    commit() moves both into place (the Parquet file last, so it is the newer one).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = parquet_path(path)
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+        self._started = False
+
+    def write(self, chunk):
+        chunk = typed(chunk)
+        csv_frame(chunk).to_csv(f"{self.path}.tmp", mode="a" if self._started else "w",
+                                header=not self._started, index=False)
+        self._started = True
+        if has_parquet():
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if self._schema is None:
+                self._schema = _arrow_schema(chunk)
+                self._writer = pq.ParquetWriter(f"{self.parquet}.tmp", self._schema)
+            self._writer.write_table(pa.Table.from_pandas(chunk, schema=self._schema, preserve_index=False))
+        self.rows += len(chunk)
+
+    def _close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def commit(self):
+        self._close()
+        os.replace(f"{self.path}.tmp", self.path)
+        if os.path.exists(f"{self.parquet}.tmp"):
+            os.replace(f"{self.parquet}.tmp", self.parquet)
+        elif os.path.exists(self.parquet):
+            # no pyarrow: a Parquet copy left from an earlier run is now stale
+            os.remove(self.parquet)
+
+    def discard(self):
+        self._close()
+        for tmp in (f"{self.path}.tmp", f"{self.parquet}.tmp"):
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+def save_table(df, path):
+    """Write a whole table as CSV plus its typed Parquet copy."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    writer = TableWriter(path)
+    writer.write(df)
+    writer.commit()
+
+def load_table(path, columns=None):
+    """
+    Load a post table with only the given columns (all if None) and the table
+    dtypes, from the Parquet copy when it is current, else from the CSV.
+    Requested columns the table doesn't have are skipped.
+    """
+    parquet = parquet_path(path)
+    if _parquet_current(path, parquet):
+        import pyarrow.parquet as pq
+
+        names = pq.read_schema(parquet).names
+        selected = [column for column in columns if column in names] if columns is not None else names
+        return pd.read_parquet(parquet, columns=selected,
+                               read_dictionary=[column for column in CATEGORY_COLUMNS if column in selected])
+    usecols = (lambda column: column in columns) if columns is not None else None
+    return typed(pd.read_csv(path, usecols=usecols))
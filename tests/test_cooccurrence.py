@@ -0,0 +1,62 @@
+# tests/test_cooccurrence.py
+# Run from the project root: python -m pytest tests
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from visualizations.cooccurrence import CooccurrenceIndex
+
+DOCS = [
+    "python error import module",
+    "react state hook error",
+    "python pandas dataframe error",
+    "docker image build error",
+    "react component state",
+    "python import pandas",
+]
+IDS = [f"p{i}" for i in range(len(DOCS))]
+
+
+def assert_same(index, rebuilt):
+    assert index.terms == rebuilt.terms
+    assert (index.counts != rebuilt.counts).nnz == 0
+    assert index.top_pairs().equals(rebuilt.top_pairs())
+
+
+def test_update_matches_rebuild():
+    index = CooccurrenceIndex().build(DOCS[:3], IDS[:3])
+    index.sync(DOCS, IDS)
+    assert not index.stale
+    assert_same(index, CooccurrenceIndex().build(DOCS, IDS))
+
+
+def test_update_extends_a_small_vocabulary_without_a_rebuild():
+    index = CooccurrenceIndex(top_n=100).build(DOCS[:1], IDS[:1])
+    index.update(DOCS[1:2], IDS[1:2])
+    assert not index.stale
+    assert_same(index, CooccurrenceIndex(top_n=100).build(DOCS[:2], IDS[:2]))
+
+
+def test_deleted_post_marks_the_index_stale():
+    index = CooccurrenceIndex().build(DOCS, IDS)
+    index.sync(DOCS[1:], IDS[1:])
+    assert index.stale
+    rebuilt = CooccurrenceIndex().build(DOCS[1:], IDS[1:])
+    assert rebuilt.n_docs == len(DOCS) - 1
+    assert "module" not in rebuilt.vocabulary
+
+
+def test_changed_post_marks_the_index_stale():
+    index = CooccurrenceIndex().build(DOCS, IDS)
+    index.sync(["python error"] + DOCS[1:], IDS)
+    assert index.stale
+
+
+def test_counted_posts_are_skipped():
+    index = CooccurrenceIndex().build(DOCS, IDS)
+    counts = index.counts.copy()
+    index.update(DOCS, IDS)
+    assert not index.stale
+    assert index.n_docs == len(DOCS)
+    assert (index.counts != counts).nnz == 0
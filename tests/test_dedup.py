@@ -0,0 +1,65 @@
+# tests/test_dedup.py
+# Run from the project root: python -m pytest tests
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dedup import BANDS, NUM_PERM, MinHashIndex
+
+ROWS = NUM_PERM // BANDS
+
+
+def index_with(signatures):
+    """An index whose posts (named by their text) have the given signatures instead of MinHash ones."""
+    index = MinHashIndex()
+    index.signatures_of = lambda texts: np.array([signatures[text] for text in texts], dtype=np.uint32)
+    return index
+
+
+def test_new_post_is_compared_with_every_post_in_its_bucket():
+    # all three share band 0; b and c also agree on 3 of 4 rows in every other band (49/64 ~ 0.77)
+    # while a shares nothing else with c, so a, the first post of the bucket, is not a match
+    a = np.arange(1000, 1000 + NUM_PERM)
+    b = np.arange(2000, 2000 + NUM_PERM)
+    c = b.copy()
+    a[:ROWS] = b[:ROWS] = c[:ROWS] = [1, 2, 3, 4]
+    c[ROWS::ROWS] += 5000
+    index = index_with({"a": a, "b": b, "c": c})
+
+    index.update(["a", "b"], ["a", "b"])
+    index.update(["c"], ["c"])
+    roots = index.roots()
+    assert roots[index.position["c"]] == roots[index.position["b"]]
+    assert roots[index.position["a"]] != roots[index.position["b"]]
+
+
+def test_identical_posts_are_grouped_with_the_first_copy():
+    signature = np.arange(NUM_PERM)
+    other = np.arange(NUM_PERM) + 500
+    index = index_with({"x": signature, "y": other})
+    index.update(["p1", "p2"], ["x", "y"])
+    index.update(["p3", "p4"], ["x", "x"])
+    roots = index.roots()
+    assert roots[index.position["p3"]] == roots[index.position["p4"]] == index.position["p1"]
+    assert roots[index.position["p2"]] == index.position["p2"]
+
+
+def test_incremental_update_matches_a_rebuild():
+    rng = np.random.RandomState(0)
+    base = rng.randint(0, 10_000, size=(40, NUM_PERM))
+    # every post after the first 40 is a copy of an earlier one with a few rows changed
+    edits = base[rng.randint(0, 40, size=60)].copy()
+    changed = rng.rand(*edits.shape) < 0.1
+    edits[changed] = rng.randint(10_000, 20_000, size=changed.sum())
+    signatures = {str(i): row for i, row in enumerate(np.vstack([base, edits]))}
+    ids = list(signatures)
+
+    rebuilt = index_with(signatures)
+    rebuilt.update(ids, ids)
+    incremental = index_with(signatures)
+    incremental.update(ids[:50], ids[:50])
+    incremental.update(ids, ids)
+    assert np.array_equal(rebuilt.roots(), incremental.roots())
@@ -0,0 +1,58 @@
+# tests/test_rollups.py
+# Run from the project root: python -m pytest tests
+
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import rollups
+from rollups import KEYS, rollup_posts, update_rollups
+
+DAY = 86400
+JAN = 1704067200  # 2024-01-01
+
+
+def posts():
+    return pd.DataFrame({
+        "id": ["a", "b", "c", "d", "e"],
+        "created_utc": [JAN, JAN + DAY, JAN + 2 * DAY, JAN + 40 * DAY, None],
+        "subreddit": ["python", "python", "webdev", "webdev", "python"],
+        "problem_signal": [True, False, True, False, True],
+        "topic_id": [0, 1, 0, 1, 0],
+        "topic_keywords": ["k0", "k1", "k0", "k1", "k0"],
+    })
+
+
+def canonical(table):
+    return (table.sort_values(KEYS).reset_index(drop=True)
+            .astype({"value": str, "posts": "int64", "problem_posts": "int64"}))
+
+
+def from_scratch(df):
+    return canonical(rollup_posts(df).groupby(KEYS, as_index=False)[["posts", "problem_posts"]].sum())
+
+
+def test_changed_and_removed_posts_match_a_recount(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)  # rollups live under data/rollups
+    update_rollups(posts())
+
+    df = posts()
+    df.loc[df["id"] == "a", ["topic_id", "topic_keywords"]] = [1, "k1"]  # new topic
+    df.loc[df["id"] == "b", "created_utc"] = JAN + 35 * DAY  # moved to February
+    df = df[df["id"] != "c"]  # deleted
+    df = pd.concat([df, pd.DataFrame([{"id": "f", "created_utc": JAN + 3 * DAY, "subreddit": "webdev",
+                                       "problem_signal": True, "topic_id": 1, "topic_keywords": "k1"}])])
+
+    stored, added = update_rollups(df)
+    assert added == 3  # a and b changed, f is new
+    assert canonical(stored).equals(from_scratch(df))
+    assert canonical(rollups.read_rollups()).equals(from_scratch(df))
+
+
+def test_undated_posts_count_in_the_total_bucket(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)  # rollups live under data/rollups
+    update_rollups(posts())
+    assert rollups.load_rollups("total", "all")["posts"].tolist() == [5]
+    assert rollups.load_rollups("month", "all")["posts"].sum() == 4
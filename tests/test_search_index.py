@@ -0,0 +1,39 @@
+# tests/test_search_index.py
+# Run from the project root: python -m pytest tests
+
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from search_index import SearchIndex
+
+
+def posts():
+    return pd.DataFrame({
+        "id": ["a", "b", "c"],
+        "topic_id": [0, 1, 1],
+        "title": ["slow builds", "flaky tests", "missing docs"],
+        "text": ["the build takes forever", "tests fail at random", "nobody wrote docs"],
+        "clean_text": ["build take forever", "test fail random", "nobody write doc"],
+    })
+
+
+def test_changed_posts_are_reindexed(tmp_path):
+    with SearchIndex(str(tmp_path / "search.sqlite")) as index:
+        assert index.update(posts()) == (3, 0, 0)
+
+        df = posts()
+        df.loc[df["id"] == "a", ["title", "text", "clean_text"]] = ["slow deploys", "the deploy hangs", "deploy hang"]
+        df.loc[df["id"] == "b", "topic_id"] = 2  # new topic only
+        df = df[df["id"] != "c"]
+        assert index.update(df) == (0, 2, 1)
+        assert index.update(df) == (0, 0, 0)
+
+        assert len(index) == 2
+        assert index.search("builds").empty
+        assert index.search("deploys")["id"].tolist() == ["a"]
+        assert index.search("docs").empty
+        assert index.search("flaky", topic_ids=[2])["id"].tolist() == ["b"]
+        assert index.search("flaky", topic_ids=[1]).empty
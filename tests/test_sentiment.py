@@ -0,0 +1,53 @@
+# tests/test_sentiment.py
+# Run from the project root: python -m pytest tests
+
+import os
+import sys
+
+import numpy as np
+from textblob import TextBlob
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from result_cache import ResultCache
+from sentiment import get_backend
+
+TEXTS = [
+    "this library is good",
+    "this library is not good",  # negation
+    "the docs are very good",  # modifier
+    "the docs are not very good",  # negated modifier
+    "definitely not good at all",
+    "great!",  # "!" boosts the word before it
+    "great!!! works now",
+    "finally fixed it :)",  # emoticons
+    "build broke again :(",
+    "i don't like the new api",  # quotes split words, "n't" doesn't negate
+    "it's a \"great\" release",
+    "real-time sync is terrible, asp.net is fine",
+    "nothing to say here",
+    "",
+]
+
+
+def test_lexicon_backend_matches_textblob():
+    expected = np.array([TextBlob(text.lower()).sentiment.polarity for text in TEXTS])
+    assert np.allclose(get_backend("lexicon").polarity(TEXTS), expected, atol=1e-6)
+    assert np.allclose(get_backend("textblob").polarity(TEXTS), expected)
+
+
+def test_cached_results_are_kept_per_backend(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    with ResultCache(path, version="v1", backend="textblob") as cache:
+        cache.put_many([("k1", "good post", 0.7, False), ("k2", "bad post", -0.7, True)])
+
+    with ResultCache(path, version="v1", backend="lexicon") as cache:
+        assert cache.get_many(["k1", "k2"]) == {}
+        assert cache.purge_stale() == 0
+    with ResultCache(path, version="v1", backend="textblob") as cache:
+        assert cache.get_many(["k1", "k2"]) == {"k1": ("good post", 0.7, False), "k2": ("bad post", -0.7, True)}
+
+    with ResultCache(path, version="v2", backend="textblob") as cache:
+        assert cache.get_many(["k1"]) == {}
+        assert cache.purge_stale() == 2
+    with ResultCache(path, version="v1", backend="textblob") as cache:
+        assert cache.get_many(["k1", "k2"]) == {}
@@ -1,34 +1,123 @@
 import re
-import nltk
-import pandas as pd
-from nltk.corpus import stopwords
-from nltk.tokenize import TreebankWordTokenizer
-from textblob import TextBlob
+import json
+import hashlib
 import os
+import argparse
+from collections import deque
+from functools import lru_cache
 
-# Download stopwords
-nltk.download("stopwords")
+import raw_store
+from instrumentation import measure
+from keyword_matcher import KeywordMatcher
+from result_cache import CACHE_PATH, ResultCache, text_key
 
-# Initialize tokenizer and stopword set
-tokenizer = TreebankWordTokenizer()
-stop_words = set(stopwords.words("english"))
+# NLTK, TextBlob, pandas and the sentiment backends are imported on first use so that importing this
+# module (e.g. from app.py or a Streamlit page) stays cheap.
+
+# Copy of NLTK's English stopword list, so cleaning works offline
+STOPWORDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "stopwords_english.txt")
+
+@lru_cache(maxsize=None)
+def get_stop_words():
+    if os.path.exists(STOPWORDS_PATH):
+        with open(STOPWORDS_PATH) as f:
+            return frozenset(line.strip() for line in f if line.strip())
+    import nltk
+    from nltk.corpus import stopwords
+    nltk.download("stopwords", quiet=True)
+    return frozenset(stopwords.words("english"))
+
+@lru_cache(maxsize=None)
+def get_tokenizer():
+    from nltk.tokenize import TreebankWordTokenizer
+    return TreebankWordTokenizer()
+
+def __getattr__(name):
+    # keep the old module-level names working
+    if name == "stop_words":
+        return get_stop_words()
+    if name == "tokenizer":
+        return get_tokenizer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Bump when clean_text/label_post logic changes so cached results are recomputed
+CLEANER_VERSION = 1
 
 # Keywords commonly indicating a "problem signal"
 PROBLEM_KEYWORDS = [
     "stuck", "error", "can't", "issue", "bug", "frustrated", "problem",
     "help", "how do i", "why does", "not working", "fail", "failed", "fix", "broken"
 ]
+PROBLEM_MATCHER = KeywordMatcher(PROBLEM_KEYWORDS)
+
+URL_PATTERN = re.compile(r"http\S+")
+NON_ALPHA_PATTERN = re.compile(r"[^a-z\s]")
+
+# Once text is reduced to [a-z\s], the only thing TreebankWordTokenizer does
+# beyond a whitespace split is break up these contractions
+TREEBANK_SPLITS = {
+    "cannot": ["can", "not"],
+    "gimme": ["gim", "me"],
+    "gonna": ["gon", "na"],
+    "gotta": ["got", "ta"],
+    "lemme": ["lem", "me"],
+    "wanna": ["wan", "na"],
+}
+
+def fast_tokenize(text):
+    r"""Split-based tokenizer; same tokens as TreebankWordTokenizer on [a-z\s] text."""
+    tokens = []
+    for word in text.split():
+        if word in TREEBANK_SPLITS:
+            tokens.extend(TREEBANK_SPLITS[word])
+        else:
+            tokens.append(word)
+    return tokens
 
 def clean_text(text):
     if not isinstance(text, str):
         return ""
     text = text.lower()
-    text = re.sub(r"http\S+", "", text)  # Remove URLs
-    text = re.sub(r"[^a-z\s]", "", text)  # Remove non-alpha
-    tokens = tokenizer.tokenize(text)
+    text = URL_PATTERN.sub("", text)  # Remove URLs
+    text = NON_ALPHA_PATTERN.sub("", text)  # Remove non-alpha
+    stop_words = get_stop_words()
+    tokens = get_tokenizer().tokenize(text)
     cleaned = [word for word in tokens if word not in stop_words and len(word) > 2]
     return " ".join(cleaned)
 
+def clean_texts(texts, tokenize="fast"):
+    """
+    Batch version of clean_text over a whole column.
+    Lowercasing and regex removal run as pandas .str ops; tokenize="treebank"
+    uses TreebankWordTokenizer instead of the split-based tokenizer.
+    """
+    import pandas as pd
+
+    texts = pd.Series(texts)
+    texts = texts.where(texts.map(lambda x: isinstance(x, str)), "")
+    texts = (texts.str.lower()
+             .str.replace(URL_PATTERN, "", regex=True)
+             .str.replace(NON_ALPHA_PATTERN, "", regex=True))
+    tokenize = get_tokenizer().tokenize if tokenize == "treebank" else fast_tokenize
+    stop_words = get_stop_words()
+    cleaned = [
+        " ".join([word for word in tokenize(text) if len(word) > 2 and word not in stop_words])
+        for text in texts
+    ]
+    return pd.Series(cleaned, index=texts.index, dtype=object)
+
+def has_problem_keyword(text):
+    text = text.lower()
+    return PROBLEM_MATCHER.search(text)
+
+def sentiment_polarity(text):
+    from sentiment import get_backend
+    return float(get_backend().polarity([text])[0])
+
+def is_problem(keyword_match, sentiment_score):
+    # Require both keyword and mild negativity to reduce false positives
+    return keyword_match and sentiment_score < 0.1
+
 def label_post(text):
     """
     Improved labeling logic:
@@ -37,45 +126,154 @@ def label_post(text):
     """
     if not isinstance(text, str):
         return False
-    text = text.lower()
-    keyword_match = any(keyword in text for keyword in PROBLEM_KEYWORDS)
-    sentiment_score = TextBlob(text).sentiment.polarity
+    return is_problem(has_problem_keyword(text), sentiment_polarity(text))
 
-    # Require both keyword and mild negativity to reduce false positives
-    return keyword_match and sentiment_score < 0.1
+def label_posts(texts, backend=None):
+    """Batch version of label_post: (polarities, problem labels), scored by the named or selected sentiment backend."""
+    from sentiment import get_backend
 
-def main():
-    input_path = "data/raw_data.json"
-    output_path = "data/cleaned_labeled_posts.csv"
+    texts = [text if isinstance(text, str) else "" for text in texts]
+    polarity = get_backend(backend).polarity(texts).tolist()
+    signal = [is_problem(has_problem_keyword(text), score) for text, score in zip(texts, polarity)]
+    return polarity, signal
 
-    if not os.path.exists(input_path):
-        print("raw_data.json not found. Please scrape posts first.")
-        return
+def cache_version():
+    """
+    Fingerprint of everything clean_text/label_post depend on besides the
+    sentiment backend (the cache keeps results per backend); cached rows from
+    other versions are ignored.
+    """
+    payload = json.dumps([CLEANER_VERSION, PROBLEM_KEYWORDS, sorted(get_stop_words())])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
 
-    df = pd.read_json(input_path)
+def clean_and_label(df, cache_path=None):
+    """
+    Add combined_text, clean_text and problem_signal columns to a chunk of raw posts.
+    With `cache_path`, posts whose combined text is already in the result cache
+    are not cleaned or scored again.
+    """
+    from sentiment import backend_name
 
     # Combine title and body
     df["combined_text"] = (df["title"].fillna("") + " " + df["text"].fillna("")).astype(str)
 
-    # Clean text
-    df["clean_text"] = df["combined_text"].apply(clean_text)
+    if cache_path is None:
+        # Clean text
+        with measure("clean.clean_texts", rows=len(df)):
+            df["clean_text"] = clean_texts(df["combined_text"])
+
+        # Label data
+        with measure("clean.label_posts", rows=len(df), sentiment=backend_name()):
+            _, signal = label_posts(df["combined_text"])
+            df["problem_signal"] = signal
+        return df
+
+    with ResultCache(cache_path, cache_version(), backend_name()) as cache:
+        keys = [text_key(text) for text in df["combined_text"]]
+        results = cache.get_many(set(keys))
+
+        # Only pay for posts that are not cached yet
+        missing = {}
+        for i, key in enumerate(keys):
+            if key not in results and key not in missing:
+                missing[key] = i
+        if missing:
+            texts = df["combined_text"].iloc[list(missing.values())]
+            with measure("clean.clean_texts", rows=len(texts)):
+                clean = clean_texts(texts)
+            with measure("clean.label_posts", rows=len(texts), sentiment=backend_name()):
+                polarity, signal = label_posts(texts)
+            rows = list(zip(missing.keys(), clean, polarity, signal))
+            cache.put_many(rows)
+            results.update({key: (c, p, s) for key, c, p, s in rows})
+
+    df["clean_text"] = [results[key][0] for key in keys]
+    df["problem_signal"] = [results[key][2] for key in keys]
+    return df
+
+def process_chunks(chunks, workers=1, cache_path=None):
+    """
+    Run clean_and_label over a stream of chunks, in order.
+    With workers > 1 chunks go through a process pool; only a few chunks per
+    worker are in flight at once so memory stays bounded.
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield clean_and_label(chunk, cache_path)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
 
-    # Label data
-    df["problem_signal"] = df["combined_text"].apply(label_post)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(clean_and_label, chunk, cache_path))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def main(workers=1, chunk_size=raw_store.CHUNK_SIZE, use_cache=True):
+    output_path = "data/cleaned_labeled_posts.csv"
+
+    raw_store.migrate_legacy()
+    if not os.path.exists(raw_store.RAW_STORE_PATH):
+        print("raw_posts.jsonl not found. Please scrape posts first.")
+        return
+
+    cache_path = CACHE_PATH if use_cache else None
+    if cache_path:
+        # only rows of another cleaner/labeler version; other backends' results stay
+        with ResultCache(cache_path, cache_version()) as cache:
+            stale = cache.purge_stale()
+        if stale:
+            print(f"Dropped {stale} cached results from an older cleaner/labeler version")
+
+    import pandas as pd
+    from tables import TableWriter
+
+    # Stream the store chunk by chunk so memory stays flat as history grows
+    os.makedirs("data", exist_ok=True)
+    label_counts = pd.Series(dtype="int64")
+    chunks = raw_store.iter_chunks(chunksize=chunk_size)
+    writer = TableWriter(output_path)  # CSV plus a typed Parquet copy
+    with measure("clean", workers=workers, cached=cache_path is not None) as record:
+        for chunk in process_chunks(chunks, workers, cache_path):
+            label_counts = label_counts.add(chunk["problem_signal"].value_counts(), fill_value=0)
+            writer.write(chunk)
+        record["rows"] = writer.rows
 
     # Check class balance
-    label_counts = df["problem_signal"].value_counts()
+    label_counts = label_counts.astype("int64")
     print("\n Label Distribution:")
     print(label_counts)
 
     if len(label_counts) < 2:
         print("Only one class detected. Please adjust labeling criteria.")
+        writer.discard()
         return
 
     # Save labeled data
-    os.makedirs("data", exist_ok=True)
-    df.to_csv(output_path, index=False)
+    writer.commit()
     print("Cleaned and labeled posts saved to data/cleaned_labeled_posts.csv")
 
+def parse_args():
+    from sentiment import BACKENDS, DEFAULT_BACKEND
+
+    parser = argparse.ArgumentParser(description="Clean and label scraped posts.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of processes cleaning and labeling chunks in parallel")
+    parser.add_argument("--chunk-size", type=int, default=raw_store.CHUNK_SIZE,
+                        help="posts per chunk streamed from the raw store")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="recompute every post instead of reusing cached results")
+    parser.add_argument("--sentiment", choices=list(BACKENDS), default=None,
+                        help=f"sentiment backend for labeling (default: $INNOMINE_SENTIMENT or {DEFAULT_BACKEND})")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.sentiment:
+        # read by every worker process as well
+        os.environ["INNOMINE_SENTIMENT"] = args.sentiment
+    main(workers=args.workers, chunk_size=args.chunk_size, use_cache=not args.no_cache)
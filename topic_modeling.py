@@ -1,29 +1,119 @@
 # topic_modeling.py
 
+import argparse
 import pandas as pd
+import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.decomposition import NMF
+from sklearn.decomposition import NMF, MiniBatchNMF
+from scipy.optimize import linear_sum_assignment
+import joblib
 import os
 
+from feature_store import VECTORIZER_CONFIGS, load_features
+from instrumentation import measure
+from rollups import update_rollups
+from search_index import SearchIndex
+from tables import load_table, save_table
+
+MODEL_PATH = "ml_models/topic_model.pkl"
+OUTPUT_PATH = "output/ranked_problems.csv"
+TOPIC_COLUMNS = ["topic_id", "topic", "topic_keywords"]
+
 def load_data():
-    """Load cleaned and labeled posts from CSV."""
-    df = pd.read_csv("data/cleaned_labeled_posts.csv")
+    """Load the deduplicated posts (typed, from the Parquet copy when there is one)."""
+    df = load_table("data/deduped_posts.csv")
     return df
 
+def load_topic_model(path=MODEL_PATH):
+    """Load the persisted vectorizer, NMF model and topic order, if any."""
+    if not os.path.exists(path):
+        return None
+    return joblib.load(path)
+
+def save_topic_model(model, path=MODEL_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    joblib.dump(model, path)
+
+def get_top_words(H, feature_names, n_top_words=10):
+    """Top words of every topic row in H, as comma-separated strings."""
+    return [", ".join(feature_names[i] for i in topic.argsort()[:-n_top_words - 1:-1]) for topic in H]
+
+def topic_components(model):
+    """NMF components in stable topic-id order."""
+    return model["nmf"].components_[model["order"]]
+
+def align_topics(prev_H, prev_terms, H, terms):
+    """
+    Order of the rows of H that best matches prev_H row by row, so topic ids
+    survive a refit or update. Topics are compared by cosine similarity over
+    the terms both vocabularies share and matched with the Hungarian method.
+    """
+    if prev_H.shape[0] != H.shape[0]:
+        return np.arange(H.shape[0])
+    prev_index = {term: i for i, term in enumerate(prev_terms)}
+    shared = [(prev_index[term], i) for i, term in enumerate(terms) if term in prev_index]
+    if not shared:
+        return np.arange(H.shape[0])
+    prev_cols, cols = map(list, zip(*shared))
+
+    A = prev_H[:, prev_cols]
+    B = H[:, cols]
+    A = A / np.maximum(np.linalg.norm(A, axis=1, keepdims=True), 1e-12)
+    B = B / np.maximum(np.linalg.norm(B, axis=1, keepdims=True), 1e-12)
+    rows, order = linear_sum_assignment(-(A @ B.T))
+    return order[np.argsort(rows)]
+
+def fit_topic_model(docs, n_topics=10, previous=None, online=False, features=None):
+    """
+    Fit a vectorizer and NMF model from scratch; returns the model and the
+    document-topic matrix in stable topic order. With `previous`, topic ids are
+    aligned to the previous model. `online` uses MiniBatchNMF so the model can
+    later be updated with update_topic_model(). `features` is an already
+    fitted (tfidf matrix, vectorizer) pair from the feature store.
+    """
+    if features is not None:
+        tfidf, tfidf_vectorizer = features
+    else:
+        tfidf_vectorizer = TfidfVectorizer(**VECTORIZER_CONFIGS["english"])
+        tfidf = tfidf_vectorizer.fit_transform(docs)
+
+    nmf = (MiniBatchNMF if online else NMF)(n_components=n_topics, random_state=42)
+    with measure("topics.fit", rows=tfidf.shape[0], online=online):
+        W = nmf.fit_transform(tfidf)
+
+    order = np.arange(n_topics)
+    if previous is not None:
+        order = align_topics(topic_components(previous), previous["vectorizer"].get_feature_names_out(),
+                             nmf.components_, tfidf_vectorizer.get_feature_names_out())
+
+    model = {"vectorizer": tfidf_vectorizer, "nmf": nmf, "order": order, "n_docs": tfidf.shape[0]}
+    return model, W[:, order]
+
+def update_topic_model(model, new_docs):
+    """
+    Fold a batch of new documents into an online model with partial_fit and
+    re-align topic ids. The vocabulary stays the one of the first fit.
+    Returns the document-topic matrix of the new documents.
+    """
+    vectorizer, nmf = model["vectorizer"], model["nmf"]
+    X = vectorizer.transform(new_docs)
+    previous = topic_components(model)
+    with measure("topics.update", rows=X.shape[0]):
+        nmf.partial_fit(X)
+
+    terms = vectorizer.get_feature_names_out()
+    model["order"] = align_topics(previous, terms, nmf.components_, terms)
+    model["n_docs"] += X.shape[0]
+    return nmf.transform(X)[:, model["order"]]
+
 def extract_topics(docs, n_topics=10, n_top_words=10):
     """Run NMF to extract topics and top words."""
-    tfidf_vectorizer = TfidfVectorizer(max_df=0.95, min_df=2, stop_words="english")
-    tfidf = tfidf_vectorizer.fit_transform(docs)
-
-    nmf = NMF(n_components=n_topics, random_state=42)
-    W = nmf.fit_transform(tfidf)
-    H = nmf.components_
+    with measure("topics.extract", rows=len(docs)):
+        model, W = fit_topic_model(docs, n_topics)
+    tfidf_vectorizer, nmf = model["vectorizer"], model["nmf"]
 
     feature_names = tfidf_vectorizer.get_feature_names_out()
-    topics = []
-    for topic_idx, topic in enumerate(H):
-        top_words = [feature_names[i] for i in topic.argsort()[:-n_top_words - 1:-1]]
-        topics.append(", ".join(top_words))
+    topics = get_top_words(topic_components(model), feature_names, n_top_words)
 
     doc_topics = W.argmax(axis=1)
     return topics, doc_topics, tfidf_vectorizer, nmf
@@ -33,22 +123,83 @@ def save_outputs(df, topics, doc_topics):
     df["topic_id"] = doc_topics
     df["topic"] = df["topic_id"].apply(lambda x: f"Topic {x}")  # <- Required for Streamlit filters
     df["topic_keywords"] = df["topic_id"].apply(lambda x: topics[x])
-    
-    os.makedirs("output", exist_ok=True)
-    df.to_csv("output/ranked_problems.csv", index=False)
-    print("Topics added and saved to output/ranked_problems.csv")
 
-def main():
-    df = load_data()
+    save_table(df, OUTPUT_PATH)
+    print(f"Topics added and saved to {OUTPUT_PATH}")
+
+def run_incremental(df, model):
+    """
+    Update the saved online model with posts that are not in ranked_problems.csv
+    yet; existing posts keep their topic ids. Returns None when a full fit is needed.
+    """
+    if not os.path.exists(OUTPUT_PATH) or "id" not in df.columns:
+        return None
+    ranked = load_table(OUTPUT_PATH, ["id", "topic_id"])
+    if "id" not in ranked.columns:
+        return None
+
+    # known posts keep their topic but take the other columns from df, where
+    # dedup may have added a new cross-post's score and comments
+    topic_of = ranked.drop_duplicates("id").set_index("id")["topic_id"]
+    known = df["id"].isin(topic_of.index)
+    old_df, new_df = df[known], df[~known]
+    print(f"{len(new_df)} new posts since the last topic update")
+
+    doc_topics = topic_of.reindex(old_df["id"]).to_numpy()
+    if not new_df.empty:
+        W = update_topic_model(model, new_df["clean_text"].fillna(""))
+        doc_topics = np.concatenate([doc_topics, W.argmax(axis=1)])
+
+    combined = pd.concat([old_df, new_df], ignore_index=True)
+    return combined, doc_topics
+
+def main(incremental=False, derived=True, refit=False):
+    with measure("topics.load", rows=None) as record:
+        df = load_data()
+        record["rows"] = len(df)
     print("Loaded", len(df), "posts")
 
-    topics, doc_topics, _, _ = extract_topics(df["clean_text"])
+    previous = load_topic_model()
+    result = None
+    if incremental and not refit and previous is not None and hasattr(previous["nmf"], "partial_fit"):
+        result = run_incremental(df, previous)
+        model = previous
+    if result is None:
+        model, W = fit_topic_model(df["clean_text"].fillna(""), previous=previous, online=incremental,
+                                   features=load_features("english"))
+        result = df, W.argmax(axis=1)
+    df, doc_topics = result
+
+    topics = get_top_words(topic_components(model), model["vectorizer"].get_feature_names_out())
 
     print("\n📚 Topics Discovered:")
     for i, topic in enumerate(topics):
         print(f"🔹 Topic {i}: {topic}")
 
     save_outputs(df, topics, doc_topics)
+    save_topic_model(model)
+    if not derived:
+        return
+
+    # keep the trend rollups in step with the new topic assignments
+    rollups, added = update_rollups(df)
+    print(f"Rolled up {added} posts into {len(rollups)} trend buckets")
+
+    # and the dashboard's full-text search index
+    with SearchIndex() as index:
+        added, changed, removed = index.update(df)
+    print(f"Search index: {added} posts added, {changed} changed, {removed} removed")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Extract NMF topics from cleaned posts.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="update the saved online model with new posts instead of refitting")
+    parser.add_argument("--refit", action="store_true",
+                        help="fit a new model even with --incremental; topic ids stay aligned to the saved one")
+    parser.add_argument("--no-derived", dest="derived", action="store_false",
+                        help="don't refresh the trend rollups and search index (innomine runs them as their own stages)")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    main(incremental=args.incremental, derived=args.derived, refit=args.refit)
@@ -0,0 +1,192 @@
+# visualizations/cooccurrence.py
+
+import hashlib
+import os
+import sys
+from collections import Counter
+
+import joblib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+# make the project root importable when run as `python visualizations/<script>.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tables import DEDUPED_PATH, load_table
+
+STATE_PATH = "data/cooccurrence/state.pkl"
+PAIRS_PATH = "output/top_pairs.csv"
+TOP_N_TERMS = 2000  # pairs are counted among the most frequent terms only
+TOP_PAIRS = 200
+
+def fingerprint(text):
+    """Stable 64-bit hash of a post's text, to notice posts that changed since they were counted."""
+    if not isinstance(text, str):
+        return -1
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little", signed=True)
+
+class CooccurrenceIndex:
+    """
+    Keyword co-occurrence counts (number of posts containing both words) as a
+    sparse matrix product: with X the binary post x term matrix restricted to
+    the top-N terms, X.T @ X holds every pair count at once. Counts can be
+    updated batch by batch; if the top-N terms drift in a way the new batch
+    alone can't account for, or a counted post changed or disappeared, `stale`
+    is set and the index should be rebuilt.
+    """
+
+    def __init__(self, top_n=TOP_N_TERMS):
+        self.top_n = top_n
+        self.doc_freq = Counter()
+        self.terms = []
+        self.vocabulary = {}
+        self.counts = sp.csr_matrix((0, 0), dtype=np.int64)
+        self.fingerprints = {}  # post id -> fingerprint of the text that was counted
+        self.n_docs = 0
+        self.stale = False
+
+    @staticmethod
+    def _token_sets(texts):
+        return [set(text.split()) for text in texts if isinstance(text, str)]
+
+    def _ranked_terms(self):
+        ranked = sorted(self.doc_freq.items(), key=lambda item: (-item[1], item[0]))
+        return [term for term, _ in ranked[:self.top_n]]
+
+    def _set_terms(self, terms):
+        """Track `terms` (in this order); counts of pairs with a term that wasn't tracked start at zero."""
+        old = np.array([self.vocabulary.get(term, -1) for term in terms], dtype=np.int64)
+        kept = np.flatnonzero(old >= 0)
+        P = sp.csr_matrix((np.ones(len(kept), dtype=np.int64), (kept, old[kept])),
+                          shape=(len(terms), len(self.terms)))
+        symmetric = self.counts + self.counts.T
+        self.counts = sp.triu(P @ symmetric @ P.T, k=1).tocsr()
+        self.terms = list(terms)
+        self.vocabulary = {term: i for i, term in enumerate(self.terms)}
+
+    def _binary_matrix(self, token_sets):
+        indptr, indices = [0], []
+        for tokens in token_sets:
+            indices.extend(sorted(self.vocabulary[t] for t in tokens if t in self.vocabulary))
+            indptr.append(len(indices))
+        data = np.ones(len(indices), dtype=np.int64)
+        return sp.csr_matrix((data, indices, indptr), shape=(len(token_sets), len(self.terms)))
+
+    def _pair_counts(self, token_sets):
+        X = self._binary_matrix(token_sets)
+        # upper triangle only: each unordered pair once, no word-with-itself
+        return sp.triu(X.T @ X, k=1).tocsr()
+
+    def _new_posts(self, texts, ids):
+        """Texts of the posts not counted yet. A counted post whose text has changed marks the index stale."""
+        if ids is None:
+            return list(texts)
+        fresh = []
+        for text, post_id in zip(texts, ids):
+            known = self.fingerprints.get(post_id)
+            if known is None:
+                self.fingerprints[post_id] = fingerprint(text)
+                fresh.append(text)
+            elif known != fingerprint(text):
+                self.stale = True
+        return fresh
+
+    def build(self, texts, ids=None):
+        """Count everything from scratch."""
+        self.__init__(self.top_n)
+        token_sets = self._token_sets(self._new_posts(texts, ids))
+        for tokens in token_sets:
+            self.doc_freq.update(tokens)
+        self.terms = self._ranked_terms()
+        self.vocabulary = {term: i for i, term in enumerate(self.terms)}
+        self.counts = self._pair_counts(token_sets)
+        self.n_docs = len(token_sets)
+        self.stale = False
+        return self
+
+    def update(self, texts, ids=None):
+        """Add a batch of new posts; posts whose id was already counted are skipped."""
+        token_sets = self._token_sets(self._new_posts(texts, ids))
+        if not token_sets or self.stale:
+            return self
+        unseen = {term for tokens in token_sets for term in tokens if term not in self.doc_freq}
+        for tokens in token_sets:
+            self.doc_freq.update(tokens)
+        self.n_docs += len(token_sets)
+
+        # the top-N terms a rebuild would pick can only be tracked exactly if
+        # each was tracked already or first appears in this batch (so all its
+        # pairs are in the batch); any other newcomer has uncounted pairs
+        terms = self._ranked_terms()
+        if any(term not in self.vocabulary and term not in unseen for term in terms):
+            self.stale = True
+            return self
+        if terms != self.terms:
+            self._set_terms(terms)
+        self.counts = (self.counts + self._pair_counts(token_sets)).tocsr()
+        return self
+
+    def sync(self, texts, ids):
+        """
+        Bring the index in line with the full current set of posts: new posts
+        are added, and a counted post that is gone (deleted, or folded into
+        another by dedup) or changed marks the index stale.
+        """
+        ids = list(ids)
+        current = set(ids)
+        if any(post_id not in current for post_id in self.fingerprints):
+            self.stale = True
+            return self
+        return self.update(texts, ids)
+
+    def top_pairs(self, n=TOP_PAIRS):
+        """The n most frequent word pairs as a DataFrame (word1, word2, count)."""
+        pairs = self.counts.tocoo()
+        order = np.argsort(-pairs.data, kind="stable")[:n]
+        return pd.DataFrame({
+            "word1": [self.terms[i] for i in pairs.row[order]],
+            "word2": [self.terms[j] for j in pairs.col[order]],
+            "count": pairs.data[order],
+        })
+
+def load_index(path=STATE_PATH):
+    if not os.path.exists(path):
+        return None
+    # stored as a plain dict so the pickle does not depend on how this module was run
+    state = joblib.load(path)
+    if "fingerprints" not in state:
+        return None  # saved before post texts were fingerprinted
+    index = CooccurrenceIndex()
+    index.__dict__.update(state)
+    return index
+
+def save_index(index, path=STATE_PATH, pairs_path=PAIRS_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    joblib.dump(index.__dict__, path)
+    os.makedirs(os.path.dirname(pairs_path), exist_ok=True)
+    index.top_pairs().to_csv(pairs_path, index=False)
+
+def load_top_pairs(n=30, pairs_path=PAIRS_PATH):
+    """Precomputed top pairs for the Insights network, or None if not built yet."""
+    if not os.path.exists(pairs_path):
+        return None
+    return pd.read_csv(pairs_path, nrows=n)
+
+def main():
+    df = load_table(DEDUPED_PATH, ["id", "clean_text"])
+    ids = df["id"].tolist() if "id" in df.columns else None
+
+    index = load_index()
+    if index is not None and ids is not None:
+        before = index.n_docs
+        index.sync(df["clean_text"], ids)
+        print(f"Added {index.n_docs - before} new posts to the co-occurrence index")
+    if index is None or ids is None or index.stale:
+        print("Rebuilding co-occurrence index")
+        index = CooccurrenceIndex().build(df["clean_text"], ids)
+
+    save_index(index)
+    print(f"{index.n_docs} posts, top pairs saved to {PAIRS_PATH}")
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,109 @@
 # visualizations/problem_clustering.py
 
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import KMeans
+import numpy as np
+import joblib
+import shutil
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.decomposition import TruncatedSVD
 import umap
 import os
 
-def run_clustering(n_clusters=5):
-    file_path = "data/cleaned_labeled_posts.csv"
+from feature_store import data_version, load_features
+from instrumentation import measure
+from tables import load_table
+
+CLUSTER_DIR = "data/clustering"
+SVD_COMPONENTS = 50
+
+def cluster_path(version, n_clusters):
+    return os.path.join(CLUSTER_DIR, f"{version}-k{n_clusters}")
+
+def fit_production(X, n_clusters):
+    """
+    Sparse-friendly fit: TruncatedSVD works on the sparse TF-IDF matrix directly,
+    UMAP and MiniBatchKMeans then run on the small dense SVD space.
+    """
+    svd = TruncatedSVD(n_components=min(SVD_COMPONENTS, X.shape[1] - 1), random_state=42)
+    Z = svd.fit_transform(X)
+    reducer = umap.UMAP(random_state=42)
+    embedding = reducer.fit_transform(Z)
+    kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=42, n_init=3)
+    labels = kmeans.fit_predict(Z)
+    return {"svd": svd, "reducer": reducer, "kmeans": kmeans}, embedding, labels
+
+def load_or_fit(X, version, n_clusters):
+    """Embedding and labels for a data version; fitted once, then read from disk."""
+    path = cluster_path(version, n_clusters)
+    if os.path.exists(os.path.join(path, "labels.npy")):
+        return np.load(os.path.join(path, "embedding.npy")), np.load(os.path.join(path, "labels.npy"))
+
+    models, embedding, labels = fit_production(X, n_clusters)
+    # Only the current data version is kept
+    shutil.rmtree(CLUSTER_DIR, ignore_errors=True)
+    os.makedirs(path)
+    joblib.dump(models, os.path.join(path, "models.pkl"))
+    np.save(os.path.join(path, "embedding.npy"), embedding)
+    np.save(os.path.join(path, "labels.npy"), labels)
+    return embedding, labels
+
+def run_clustering(n_clusters=5, mode="production"):
+    """
+    Project posts to 2D and cluster them. mode="production" keeps data sparse
+    and reuses the cached fit for the current data version; mode="exact" is
+    the original dense UMAP + KMeans fit on every call.
+    """
+    file_path = "data/deduped_posts.csv"
 
     if not os.path.exists(file_path):
         print(" Data file not found.")
         return pd.DataFrame()
 
-    df = pd.read_csv(file_path)
+    df = load_table(file_path, ["title", "clean_text"])
 
     if "clean_text" not in df.columns or df["clean_text"].isnull().all():
         print("'clean_text' column missing or empty.")
         return pd.DataFrame()
 
-    # TF-IDF
-    vectorizer = TfidfVectorizer(max_features=500)
-    X = vectorizer.fit_transform(df["clean_text"])
+    # TF-IDF (shared feature store)
+    X, _ = load_features("top500", file_path)
 
-    # UMAP for 2D projection
-    reducer = umap.UMAP(random_state=42)
-    embedding = reducer.fit_transform(X.toarray())
-    df["x"] = embedding[:, 0]
-    df["y"] = embedding[:, 1]
+    if mode == "production":
+        with measure("clustering.production", rows=X.shape[0], n_clusters=n_clusters):
+            embedding, labels = load_or_fit(X, data_version(file_path), n_clusters)
+        df["x"] = embedding[:, 0]
+        df["y"] = embedding[:, 1]
+        df["cluster"] = labels
+        return df[["x", "y", "cluster", "title", "clean_text"]]
+
+    with measure("clustering.exact", rows=X.shape[0], n_clusters=n_clusters):
+        # UMAP for 2D projection
+        reducer = umap.UMAP(random_state=42)
+        embedding = reducer.fit_transform(X.toarray())
+        df["x"] = embedding[:, 0]
+        df["y"] = embedding[:, 1]
 
-    # KMeans for clustering
-    kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-    df["cluster"] = kmeans.fit_predict(X)
+        # KMeans for clustering
+        kmeans = KMeans(n_clusters=n_clusters, random_state=42)
+        df["cluster"] = kmeans.fit_predict(X)
 
     return df[["x", "y", "cluster", "title", "clean_text"]]
+
+def transform_posts(clean_texts, n_clusters=5):
+    """Place new (already cleaned) posts on the existing projection and clusters without refitting."""
+    file_path = "data/deduped_posts.csv"
+    version = data_version(file_path)
+    path = cluster_path(version, n_clusters)
+    if not os.path.exists(os.path.join(path, "models.pkl")):
+        run_clustering(n_clusters)
+    models = joblib.load(os.path.join(path, "models.pkl"))
+
+    _, vectorizer = load_features("top500", file_path)
+    Z = models["svd"].transform(vectorizer.transform(pd.Series(clean_texts).fillna("")))
+    embedding = models["reducer"].transform(Z)
+    return pd.DataFrame({
+        "x": embedding[:, 0],
+        "y": embedding[:, 1],
+        "cluster": models["kmeans"].predict(Z),
+        "clean_text": list(clean_texts),
+    })
@@ -1,37 +1,46 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+import sys
+
+# make the project root importable when run as `python visualizations/<script>.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rollups import SOURCE_COLUMNS, SOURCE_PATH, load_rollups, read_rollups, update_rollups
+from tables import DEDUPED_PATH, load_table
 
 # Ensure visual style is consistent
 sns.set(style="whitegrid")
 
-# Load cleaned data
-df = pd.read_csv("data/cleaned_labeled_posts.csv")
-
-# Ensure date format
-df["created_date"] = pd.to_datetime(df["created_date"])
-df["date"] = df["created_date"].dt.date
+# Pre-aggregated counts (rollups.py); built from the ranked posts if missing
+if read_rollups() is None:
+    update_rollups(load_table(SOURCE_PATH, SOURCE_COLUMNS))
 
 # 1. Frequency of posts over time
+daily = load_rollups("day", "all")
 plt.figure(figsize=(10, 4))
-df.groupby("date").size().plot(kind="line", marker="o", title="Posts Over Time")
+daily.set_index(daily["bucket"].dt.date)["posts"].plot(kind="line", marker="o", title="Posts Over Time")
 plt.xlabel("Date")
 plt.ylabel("Post Count")
 plt.tight_layout()
 plt.savefig("visualizations/posts_over_time.png")
 plt.clf()
 
+# per-subreddit totals, including posts without a timestamp
+by_subreddit = load_rollups("total", "subreddit").set_index("value")[["posts", "problem_posts"]]
+
 #  2. Posts by subreddit
 plt.figure(figsize=(8, 4))
-sns.countplot(y="subreddit", data=df, order=df["subreddit"].value_counts().index)
+subreddit_counts = by_subreddit["posts"].sort_values(ascending=False)
+sns.barplot(x=subreddit_counts.values, y=subreddit_counts.index)
 plt.title("Post Count by Subreddit")
+plt.xlabel("count")
+plt.ylabel("subreddit")
 plt.tight_layout()
 plt.savefig("visualizations/posts_by_subreddit.png")
 plt.clf()
 
 # 3. Problem signal proportion by subreddit
-subreddit_group = df.groupby("subreddit")["problem_signal"].mean().sort_values(ascending=False)
+subreddit_group = (by_subreddit["problem_posts"] / by_subreddit["posts"]).sort_values(ascending=False)
 subreddit_group.plot(kind="bar", color="coral", title="Problem Signal Rate by Subreddit")
 plt.ylabel("Proportion of Problem Posts")
 plt.tight_layout()
@@ -40,7 +49,8 @@ plt.clf()
 
 #  4. Top words in problem-signal posts
 from collections import Counter
-all_words = " ".join(df[df["problem_signal"] == True]["clean_text"]).split()
+df = load_table(DEDUPED_PATH, ["clean_text", "problem_signal"])
+all_words = " ".join(df[df["problem_signal"] == True]["clean_text"].dropna()).split()
 common_words = Counter(all_words).most_common(20)
 words, freqs = zip(*common_words)
 plt.figure(figsize=(10, 5))